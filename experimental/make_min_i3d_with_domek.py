@@ -13,6 +13,7 @@ Usage:
 """
 
 import sys, struct, argparse, math
+from array import array
 from pathlib import Path
 from typing import List, Tuple
 
@@ -29,50 +30,67 @@ OBJECT_CAMERA  = 0x4700
 OBJECT_XFORM   = 0x4160  # placement matrix (optional but useful for instances)
 
 # ---- Helpers
-def u16(x: int) -> bytes: return struct.pack("<H", x)
-def u32(x: int) -> bytes: return struct.pack("<I", x)
-def f32(x: float) -> bytes: return struct.pack("<f", x)
-
-def write_chunk(cid: int, payload: bytes) -> bytes:
-    return u16(cid) + u32(6 + len(payload)) + payload
+CHUNK_HDR = struct.Struct("<HI")   # chunk id, total size incl. header
+u16 = struct.Struct("<H").pack
+CAMERA_8F = struct.Struct("<8f")   # 0x4700 position, target, bank, lens
+XFORM_12F = struct.Struct("<12f")  # 0x4160 placement matrix
+
+def le_bytes(arr: array) -> bytes:
+    """Raw little-endian bytes of a typed array (3DS/I3D is little-endian)."""
+    if sys.byteorder != "little":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+_INF = float("inf")
+
+def f32_array(values) -> array:
+    """float32 array of values; like struct.pack("<f"), a finite value too large
+    for float32 raises OverflowError instead of being stored as inf."""
+    arr = array("f", values)
+    if arr.count(_INF) + arr.count(-_INF) != values.count(_INF) + values.count(-_INF):
+        raise OverflowError("float too large to pack with f format")
+    return arr
+
+def write_chunk(cid: int, *parts: bytes) -> bytes:
+    # header + payload parts in a single join (one copy per chunk)
+    return b"".join((CHUNK_HDR.pack(cid, 6 + sum(map(len, parts))), *parts))
 
 def chunk_m3d_version(v=3) -> bytes:
     return write_chunk(M3D_VERSION, u16(v))
 
 def chunk_object(name: str, *subs: bytes) -> bytes:
     name_bytes = name.encode("ascii", "ignore") + b"\x00"
-    return write_chunk(OBJECT, name_bytes + b"".join(subs))
+    return write_chunk(OBJECT, name_bytes, *subs)
 
 def chunk_object_mesh(*subs: bytes) -> bytes:
-    return write_chunk(OBJECT_MESH, b"".join(subs))
+    return write_chunk(OBJECT_MESH, *subs)
 
+# Array bodies are typed arrays serialized with a single tobytes()
 def chunk_point_array(verts: List[Tuple[float,float,float]]) -> bytes:
-    body = u16(len(verts))
-    for x,y,z in verts:
-        body += f32(x)+f32(y)+f32(z)
-    return write_chunk(POINT_ARRAY, body)
+    flat = f32_array([c for v in verts for c in v])
+    return write_chunk(POINT_ARRAY, u16(len(verts)), le_bytes(flat))
 
 def chunk_face_array(faces: List[Tuple[int,int,int]]) -> bytes:
-    body = u16(len(faces))
-    for a,b,c in faces:
-        body += u16(a)+u16(b)+u16(c)+u16(0)
-    return write_chunk(FACE_ARRAY, body)
+    # (a, b, c, flags) records; the flags column stays zero
+    recs = array("H", bytes(8*len(faces)))
+    for k in range(3):
+        recs[k::4] = array("H", [f[k] for f in faces])
+    return write_chunk(FACE_ARRAY, u16(len(faces)), le_bytes(recs))
 
 def chunk_object_uv(uvs: List[Tuple[float,float]]) -> bytes:
-    body = u16(len(uvs))
-    for u,v in uvs:
-        body += f32(u)+f32(v)
-    return write_chunk(OBJECT_UV, body)
+    flat = f32_array([c for uv in uvs for c in uv])
+    return write_chunk(OBJECT_UV, u16(len(uvs)), le_bytes(flat))
 
 def chunk_object_camera(pos=(0.0,5.0,10.0), target=(0.0,0.0,0.0), bank=0.0, lens=35.0) -> bytes:
-    body = b"".join(f32(v) for v in (*pos, *target, bank, lens))
+    body = CAMERA_8F.pack(*pos, *target, bank, lens)
     return write_chunk(OBJECT_CAMERA, body)
 
 def chunk_objectinfo(*subs: bytes) -> bytes:
-    return write_chunk(OBJECTINFO, b"".join(subs))
+    return write_chunk(OBJECTINFO, *subs)
 
 def chunk_primary(*subs: bytes) -> bytes:
-    return write_chunk(PRIMARY, b"".join(subs))
+    return write_chunk(PRIMARY, *subs)
 
 def chunk_object_xform_from_yaw(pos_xyz: Tuple[float,float,float], yaw_deg: float) -> bytes:
     """
@@ -86,10 +104,9 @@ def chunk_object_xform_from_yaw(pos_xyz: Tuple[float,float,float], yaw_deg: floa
     # [ c  0  s | x ]
     # [ 0  1  0 | y ]
     # [-s  0  c | z ]
-    m = [ c, 0.0,  s,  x,
-          0.0, 1.0, 0.0, y,
-         -s, 0.0,  c,  z ]
-    body = b"".join(f32(v) for v in m)
+    body = XFORM_12F.pack( c, 0.0,  s,  x,
+                           0.0, 1.0, 0.0, y,
+                          -s, 0.0,  c,  z )
     return write_chunk(OBJECT_XFORM, body)
 
 # ---- Scene
@@ -9,21 +9,36 @@ For EVERY OBJECT_MESH in a .3ds file:
 - Reorder ALL OBJECT_MESH subchunks by ascending numeric chunk ID (hex), incl. 0x4200
 - Preserve everything else byte-for-byte (materials, edit_config, etc.)
 - Recalculate only the necessary parent chunk sizes (OBJECT_MESH, OBJECT, OBJECTINFO, PRIMARY)
+- Optionally (--optimize-cache) reorder the faces of converted meshes for GPU
+  vertex-cache reuse; smoothing masks and material face lists follow along
 
 Safety:
 - If UV count < max vertex index referenced by faces (i.e., invalid indices),
   the mesh is left unmodified (keeps original 0x4140) to avoid corrupt 0x4200.
 
+Performance:
+- Pure stdlib, no compiled extension: the per-element work (reading the UV and
+  face arrays, the max-index safety scan, building the 0x4200 body) runs in C
+  through array.frombytes / builtin max / array.tobytes.
+- The input is memory-mapped; preserved chunks are written out as views of it.
+- For a single file, --jobs N patches the OBJECTs in N processes (files with
+  fewer than 4 OBJECTs stay sequential, the fork would cost more than it saves).
+
 Usage:
-  python patch_3ds_uv_to_i3d_numeric.py input.3ds [-o out.i3d] [--channel 1]
+  python patch_3ds_uv_to_i3d_numeric.py input.3ds [-o out.i3d] [--channel 1] [--optimize-cache] [--jobs 4]
+  python patch_3ds_uv_to_i3d_numeric.py models/ "more/*.3ds" [-o out_dir/] [--jobs 8]
 """
 
+import os
 import sys
+import glob
+import mmap
+import shutil
 import struct
 import argparse
-from io import BytesIO
+from array import array
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import Iterator, Optional, Tuple, List
 
 # --- Chunk IDs (3DS / I3D flavored) ---
 PRIMARY                 = 0x4D4D
@@ -43,40 +58,81 @@ OBJECT_TRANS_MATRIX     = 0x4160
 
 FACE_MAP_CHANNEL        = 0x4200
 
+# Precompiled binary layouts (little-endian)
+CHUNK_HDR               = struct.Struct("<HI")   # chunk id, total size incl. header
+U16                     = struct.Struct("<H")    # counts, chunk ids
+FMC_HDR                 = struct.Struct("<IH")   # 0x4200 channel index, UV count
+
 
 # --- Basic helpers ---
 def read_chunk_header(buf: bytes, off: int) -> Optional[Tuple[int, int]]:
     if off + 6 > len(buf):
         return None
-    cid, ln = struct.unpack_from("<HI", buf, off)
+    cid, ln = CHUNK_HDR.unpack_from(buf, off)
     return cid, ln
 
 def write_chunk(cid: int, payload: bytes) -> bytes:
-    return struct.pack("<HI", cid, 6 + len(payload)) + payload
+    return CHUNK_HDR.pack(cid, 6 + len(payload)) + payload
 
-def find_children(buf: bytes, start: int, end: int) -> List[Tuple[int, int, int, int]]:
+def chunk_pieces(cid: int, pieces: List[bytes]) -> List[bytes]:
+    """
+    Chunk as a list of pieces (header + body parts, bytes or memoryview)
+    so parents can nest it or stream it without concatenating the body.
+    """
+    return [CHUNK_HDR.pack(cid, 6 + sum(map(len, pieces))), *pieces]
+
+def read_array(buf: bytes, pos: int, typecode: str, count: int) -> array:
+    """`count` little-endian items of `typecode` at buf[pos:] (struct.error if truncated)."""
+    arr = array(typecode)
+    end = pos + arr.itemsize * count
+    if end > len(buf):
+        raise struct.error(f"unpack requires a buffer of {end - pos} bytes")
+    arr.frombytes(memoryview(buf)[pos:end])
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+def le_bytes(arr: array) -> bytes:
+    """Raw little-endian bytes of a typed array (3DS/I3D is little-endian)."""
+    if sys.byteorder != "little":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+def iter_children(buf: bytes, start: int, end: int) -> Iterator[Tuple[int, int, int, int]]:
     """
     Enumerate immediate child chunks within [start, end).
-    Returns list of (cid, chunk_start, chunk_len, body_start).
+    Yields (cid, chunk_start, chunk_len, body_start); every caller walks the
+    children once, so no list is built.
     """
-    out = []
+    walk = _walk_children(buf, start, end)
+    # A range claiming more bytes than the buffer holds can fail on a header
+    # read; walk it up front so that error comes before any child is handled.
+    return walk if end <= len(buf) else iter(list(walk))
+
+def _walk_children(buf: bytes, start: int, end: int) -> Iterator[Tuple[int, int, int, int]]:
+    unpack_hdr = CHUNK_HDR.unpack_from
     p = start
     while p + 6 <= end:
-        cid, ln = struct.unpack_from("<HI", buf, p)
+        cid, ln = unpack_hdr(buf, p)
         if ln < 6 or p + ln > end:
             break
-        out.append((cid, p, ln, p + 6))
+        yield cid, p, ln, p + 6
         p += ln
-    return out
 
-def read_cstr(buf: bytes, off: int) -> Tuple[str, int]:
-    p = off
-    out = bytearray()
-    while p < len(buf) and buf[p] != 0:
-        out.append(buf[p]); p += 1
-    if p < len(buf) and buf[p] == 0:
-        p += 1
-    return out.decode("ascii", errors="replace"), p
+def read_cstr(buf: bytes, off: int) -> Tuple[bytes, int]:
+    # Returns the raw string bytes including the NUL, so callers can write
+    # the name back untouched. buf may be a memoryview (no .find), so search
+    # a small bytes window and widen it only for long or unterminated strings
+    span = 64
+    while True:
+        head = bytes(buf[off:off+span])
+        end = head.find(0)
+        if end >= 0:
+            return head[:end + 1], off + end + 1
+        if off + span >= len(buf):
+            return head, max(off, len(buf))
+        span *= 4
 
 
 # --- Parsers for the data we need ---
@@ -88,13 +144,14 @@ def parse_faces(buf: bytes, body_start: int, body_end: int):
       [nested subchunks we leave as raw]
     """
     p = body_start
-    n = struct.unpack_from("<H", buf, p)[0]; p += 2
-    faces, flags = [], []
-    for _ in range(n):
-        a, b, c, fl = struct.unpack_from("<3HH", buf, p)
-        faces.append((a, b, c))
-        flags.append(fl)
-        p += 8
+    n = U16.unpack_from(buf, p)[0]; p += 2
+    # copy the records straight into an array, then split the 4-wide records;
+    # faces come back as one flat array('H') of a, b, c triples
+    recs = read_array(buf, p, "H", 4*n)
+    faces = array("H", bytes(6*n))
+    for k in range(3):
+        faces[k::3] = recs[k::4]
+    flags = recs[3::4]
     return n, faces, flags
 
 def parse_uvs(buf: bytes, body_start: int, body_end: int):
@@ -104,18 +161,15 @@ def parse_uvs(buf: bytes, body_start: int, body_end: int):
       uv_count * (float u, float v)
     """
     p = body_start
-    n = struct.unpack_from("<H", buf, p)[0]; p += 2
-    uvs = []
-    for _ in range(n):
-        u, v = struct.unpack_from("<2f", buf, p)
-        uvs.append((u, v)); p += 8
+    n = U16.unpack_from(buf, p)[0]; p += 2
+    uvs = read_array(buf, p, "f", 2*n)   # flat u, v pairs
     return n, uvs
 
 
 # --- Build 0x4200 FACE_MAP_CHANNEL ---
 def build_face_map_channel_payload(channel: int,
-                                   uvs: List[Tuple[float, float]],
-                                   faces: List[Tuple[int, int, int]]) -> bytes:
+                                   uvs: array,
+                                   faces: array) -> bytearray:
     """
     0x4200 layout:
       u32 channel
@@ -123,51 +177,176 @@ def build_face_map_channel_payload(channel: int,
       uv_count * (float u, float v)
       u16 face_count
       face_count * (u16 iu, u16 iv, u16 iw)  # UV indices per triangle
-    Strategy: map triangle (a,b,c) vertex indices directly to UV indices.
+    Strategy: map triangle (a,b,c) vertex indices directly to UV indices,
+    i.e. the flat a, b, c array from parse_faces is written as-is.
     """
-    out = BytesIO()
-    out.write(struct.pack("<I", int(channel)))
-    out.write(struct.pack("<H", len(uvs)))
-    for u, v in uvs:
-        out.write(struct.pack("<2f", float(u), float(v)))
-    out.write(struct.pack("<H", len(faces)))
-    for a, b, c in faces:
-        out.write(struct.pack("<3H", a, b, c))
-    return out.getvalue()
+    nu, nf = len(uvs) // 2, len(faces) // 3
+    # exact-size buffer, filled in place
+    out = bytearray(FMC_HDR.size + 8*nu + U16.size + 6*nf)
+    FMC_HDR.pack_into(out, 0, int(channel), nu)
+    p = FMC_HDR.size + 8*nu
+    out[FMC_HDR.size:p] = le_bytes(uvs)
+    U16.pack_into(out, p, nf)
+    out[p + U16.size:] = le_bytes(faces)
+    return out
 
 def chunk_id_of(raw: bytes) -> int:
-    return struct.unpack_from("<H", raw, 0)[0]
+    return U16.unpack_from(raw, 0)[0]
+
+
+# --- Optional vertex-cache face reordering (--optimize-cache) ---
+# Tom Forsyth's "Linear-Speed Vertex Cache Optimisation": greedily emit the
+# triangle whose corners score highest, where a vertex scores for sitting
+# near the front of a simulated LRU cache and for having few triangles left.
+FORSYTH_CACHE_SIZE      = 32
+_CACHE_SCORE = [0.75] * 3 + [(1.0 - (i - 3) / (FORSYTH_CACHE_SIZE - 3)) ** 1.5
+                             for i in range(3, FORSYTH_CACHE_SIZE)]
+
+def _forsyth_vertex_score(cache_pos: int, remaining: int) -> float:
+    if remaining == 0:
+        return -1.0
+    score = _CACHE_SCORE[cache_pos] if cache_pos >= 0 else 0.0
+    return score + 2.0 * remaining ** -0.5
+
+def forsyth_reorder(faces: array, num_verts: int) -> List[int]:
+    """
+    Face order with better post-transform vertex cache reuse.
+    faces is the flat a, b, c array (all indices < num_verts); returns the
+    old face indices in their new order.
+    """
+    nf = len(faces) // 3
+    vert_tris: List[List[int]] = [[] for _ in range(num_verts)]
+    for t in range(nf):
+        for v in faces[3*t:3*t+3]:
+            vert_tris[v].append(t)
+    cache_pos = [-1] * num_verts
+    vscore = [_forsyth_vertex_score(-1, len(ts)) for ts in vert_tris]
+    tscore = [vscore[faces[3*t]] + vscore[faces[3*t+1]] + vscore[faces[3*t+2]] for t in range(nf)]
+
+    emitted = bytearray(nf)
+    order: List[int] = []
+    cache: List[int] = []
+    best = max(range(nf), key=tscore.__getitem__, default=-1)
+    scan = 0
+    while len(order) < nf:
+        if best < 0:
+            # nothing left around the cache: continue at the next unemitted face
+            while emitted[scan]:
+                scan += 1
+            best = scan
+        t = best
+        emitted[t] = 1
+        order.append(t)
+        corners = faces[3*t:3*t+3]
+        for v in corners:
+            vert_tris[v].remove(t)
+
+        # LRU update: this face's corners move to the front
+        lru = list(dict.fromkeys(corners))
+        lru.extend(v for v in cache if v not in lru)
+        for v in lru[FORSYTH_CACHE_SIZE:]:
+            cache_pos[v] = -1
+            vscore[v] = _forsyth_vertex_score(-1, len(vert_tris[v]))
+        cache = lru[:FORSYTH_CACHE_SIZE]
+        for i, v in enumerate(cache):
+            cache_pos[v] = i
+            vscore[v] = _forsyth_vertex_score(i, len(vert_tris[v]))
+
+        # rescore the faces still hanging off cached vertices; best wins
+        best, best_score = -1, -1.0
+        for v in cache:
+            for ft in vert_tris[v]:
+                s = vscore[faces[3*ft]] + vscore[faces[3*ft+1]] + vscore[faces[3*ft+2]]
+                tscore[ft] = s
+                if s > best_score:
+                    best, best_score = ft, s
+    return order
+
+def permute_records(arr: array, width: int, perm: List[int]) -> array:
+    """Record i of the result is record perm[i] of arr (records are width items wide)."""
+    out = array(arr.typecode, bytes(arr.itemsize * width * len(perm)))
+    for k in range(width):
+        col = arr[k::width]
+        out[k::width] = array(arr.typecode, map(col.__getitem__, perm))
+    return out
+
+def renumber_material_group(buf: bytes, start: int, end: int, new_index: List[int]) -> bytes:
+    """OBJECT_MATERIAL (0x4130) with its face indices mapped through new_index."""
+    name_raw, after_name = read_cstr(buf, start + 6)
+    if after_name + 2 > end:
+        return buf[start:end]
+    cnt = U16.unpack_from(buf, after_name)[0]
+    idxs = read_array(buf, after_name + 2, "H", cnt)
+    n = len(new_index)
+    idxs = array("H", sorted(new_index[i] if i < n else i for i in idxs))
+    return write_chunk(OBJECT_MATERIAL, b"".join((
+        name_raw, U16.pack(cnt), le_bytes(idxs),
+        bytes(buf[after_name + 2 + 2*cnt:end]))))
+
+def reorder_faces_chunk(buf: bytes, body: int, end: int, perm: List[int], faces: array, flags: array) -> bytes:
+    """
+    Rebuild OBJECT_FACES (0x4120) from the already permuted faces/flags
+    columns. OBJECT_SMOOTH masks follow perm and OBJECT_MATERIAL index lists
+    are renumbered; any other nested chunk is kept as-is.
+    """
+    n = len(perm)
+    new_index = [0] * n
+    for new_i, old_i in enumerate(perm):
+        new_index[old_i] = new_i
+
+    # (a, b, c, flags) records straight from the columns
+    recs = array("H", bytes(8*n))
+    for k in range(3):
+        recs[k::4] = faces[k::3]
+    recs[3::4] = flags
+    recs_end = body + 2 + 8*n
+    pieces = [U16.pack(n), le_bytes(recs)]
+    p = recs_end
+    for scid, sstart, sln, sbody in iter_children(buf, recs_end, end):
+        send = sstart + sln
+        if scid == OBJECT_SMOOTH and sbody + 4*n <= send:
+            masks = permute_records(read_array(buf, sbody, "I", n), 1, perm)
+            pieces.append(write_chunk(OBJECT_SMOOTH, le_bytes(masks) + bytes(buf[sbody + 4*n:send])))
+        elif scid == OBJECT_MATERIAL:
+            pieces.append(renumber_material_group(buf, sstart, send, new_index))
+        else:
+            pieces.append(buf[sstart:send])
+        p = send
+    pieces.append(buf[p:end])  # trailing bytes past the last whole subchunk
+    return write_chunk(OBJECT_FACES, b"".join(pieces))
 
 
 # --- Patchers ---
-def patch_object_mesh_numeric(mesh_raw: bytes, channel: int) -> bytes:
+def patch_object_mesh_numeric(mesh_raw: bytes, channel: int, optimize_cache: bool = False) -> Tuple[List[bytes], bool]:
     """
-    Returns rebuilt OBJECT_MESH with:
+    Returns (chunk pieces, touched) for the rebuilt OBJECT_MESH with:
       - 0x4140 removed (only if safe to convert)
       - 0x4200 added
       - ALL subchunks sorted by numeric chunk ID (ascending)
-    If no 0x4140 is present (no UVs) or conversion is unsafe, returns the original mesh blob unchanged.
+      - with optimize_cache, faces reordered for vertex-cache reuse
+    If no 0x4140 is present (no UVs) or conversion is unsafe, returns ([mesh_raw], False).
     """
     cid, ln = read_chunk_header(mesh_raw, 0)
     assert cid == OBJECT_MESH and ln == len(mesh_raw), "Invalid OBJECT_MESH blob."
-    kids = find_children(mesh_raw, 6, len(mesh_raw))
 
     point_present = False
-    faces = None
+    faces = None     # flat a, b, c (array 'H')
+    flags = None     # per-face flags (array 'H')
+    faces_at = None  # (index in preserved, body, end) of OBJECT_FACES
     uvs = None
     preserved = []  # raw chunks to keep; we will omit 0x4140 only if conversion is safe
 
     # First pass: collect data and keep all chunks *except* 0x4140 (conditionally)
     # We'll decide to drop or keep 0x4140 after validating safety.
     raw_4140_chunks = []  # keep track of any 4140s we might need to preserve
-    for kcid, start, clen, body in kids:
+    for kcid, start, clen, body in iter_children(mesh_raw, 6, len(mesh_raw)):
         raw = mesh_raw[start:start+clen]
         if kcid == POINT_ARRAY:
             point_present = True
             preserved.append(raw)
         elif kcid == OBJECT_FACES:
-            _, faces_list, _ = parse_faces(mesh_raw, body, start+clen)
-            faces = faces_list
+            _, faces, flags = parse_faces(mesh_raw, body, start+clen)
+            faces_at = (len(preserved), body, start+clen)
             preserved.append(raw)
         elif kcid == OBJECT_UV_PRIMARY:
             _, uv_list = parse_uvs(mesh_raw, body, start+clen)
@@ -178,20 +357,24 @@ def patch_object_mesh_numeric(mesh_raw: bytes, channel: int) -> bytes:
 
     # If there were no UVs, nothing to convert; return original mesh blob unchanged
     if uvs is None or faces is None or not point_present:
-        return mesh_raw
+        return [mesh_raw], False
 
     # --- SAFETY: ensure UV list can index all face vertices ---
-    max_vi = 0
-    for a, b, c in faces:
-        if a > max_vi: max_vi = a
-        if b > max_vi: max_vi = b
-        if c > max_vi: max_vi = c
-    if max_vi >= len(uvs):
+    max_vi = max(faces, default=0)
+    if max_vi >= len(uvs) // 2:
         # Can't build a valid 0x4200; keep original 0x4140 for this mesh
         # Put back any raw 0x4140 chunks we held aside
         preserved.extend(raw_4140_chunks)
         # Preserve original subchunk order by reusing original blob
-        return mesh_raw
+        return [mesh_raw], False
+
+    # Optional: reorder faces (OBJECT_FACES and the 0x4200 indices in lockstep)
+    if optimize_cache and faces:
+        perm = forsyth_reorder(faces, max_vi + 1)
+        faces = permute_records(faces, 3, perm)
+        flags = permute_records(flags, 1, perm)
+        i, fbody, fend = faces_at
+        preserved[i] = reorder_faces_chunk(mesh_raw, fbody, fend, perm, faces, flags)
 
     # Build 0x4200 and add it to the set (drop 0x4140)
     fmc_chunk = write_chunk(FACE_MAP_CHANNEL, build_face_map_channel_payload(channel, uvs, faces))
@@ -200,111 +383,224 @@ def patch_object_mesh_numeric(mesh_raw: bytes, channel: int) -> bytes:
     # Numeric sort ALL subchunks now present (4140 removed, 4200 added)
     preserved.sort(key=chunk_id_of)
 
-    # Rebuild OBJECT_MESH with sorted subchunks
-    new_body = b"".join(preserved)
-    return write_chunk(OBJECT_MESH, new_body)
+    # Rebuild OBJECT_MESH with sorted subchunks (header + pieces, no join)
+    return chunk_pieces(OBJECT_MESH, preserved), True
 
 
-def patch_object_numeric(obj_raw: bytes, channel: int) -> bytes:
+def patch_object_numeric(obj_raw: bytes, channel: int, optimize_cache: bool = False) -> Tuple[List[bytes], bool]:
     """
     Rebuild an OBJECT (0x4000) by rewriting EVERY OBJECT_MESH child with numeric ordering.
-    Name and other children preserved byte-for-byte.
+    Name and other children preserved byte-for-byte. Returns (chunk pieces, touched).
     """
     cid, ln = read_chunk_header(obj_raw, 0)
     assert cid == OBJECT and ln == len(obj_raw), "Invalid OBJECT blob."
-    name, after_name = read_cstr(obj_raw, 6)
-    kids = find_children(obj_raw, after_name, len(obj_raw))
+    name_raw, after_name = read_cstr(obj_raw, 6)
 
     rebuilt = []
     touched = False
-    for kcid, start, clen, body in kids:
+    for kcid, start, clen, body in iter_children(obj_raw, after_name, len(obj_raw)):
         raw = obj_raw[start:start+clen]
         if kcid == OBJECT_MESH:
-            new_mesh = patch_object_mesh_numeric(raw, channel)
-            rebuilt.append(new_mesh)
-            if new_mesh != raw:
-                touched = True
+            new_mesh, mesh_touched = patch_object_mesh_numeric(raw, channel, optimize_cache)
+            rebuilt.extend(new_mesh)
+            touched = touched or mesh_touched
         else:
             rebuilt.append(raw)
 
     if not touched:
-        return obj_raw
+        return [obj_raw], False
+
+    # touched implies a child was parsed, so the name is NUL-terminated
+    return chunk_pieces(OBJECT, [name_raw, *rebuilt]), True
+
+
+def _patch_object_job(job) -> Tuple[List[bytes], bool]:
+    # Pool worker: views cannot be pickled, so ship the joined object back
+    raw, channel, optimize_cache = job
+    new_obj, touched = patch_object_numeric(raw, channel, optimize_cache)
+    return ([b"".join(new_obj)] if touched else []), touched
 
-    body = name.encode("ascii", errors="replace") + b"\x00" + b"".join(rebuilt)
-    return write_chunk(OBJECT, body)
 
+def patch_objectinfo_numeric(data, body: int, end: int, channel: int, optimize_cache: bool = False,
+                             jobs: int = 1) -> Tuple[List[bytes], bool]:
+    """
+    Rebuild an OBJECTINFO (0x3D3D) body by patching EVERY OBJECT child.
+    Returns (chunk pieces, touched); untouched children are views into data.
+    With jobs > 1 and at least 4 OBJECTs the objects are patched in a process pool.
+    """
+    children = [(kcid, data[start:start+ln]) for kcid, start, ln, _body in iter_children(data, body, end)]
+    objects = [raw for kcid, raw in children if kcid == OBJECT]
+    if jobs > 1 and len(objects) >= 4:
+        # imported here, like the batch pool: most runs never need it
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            results = list(ex.map(_patch_object_job, [(bytes(raw), channel, optimize_cache) for raw in objects],
+                                  chunksize=max(1, len(objects) // (4 * jobs))))
+        patched = iter(results)
+    else:
+        patched = (patch_object_numeric(raw, channel, optimize_cache) for raw in objects)
 
-def patch_file_numeric(src_path: Path, dst_path: Path, channel: int = 1):
-    data = bytearray(src_path.read_bytes())
+    rebuilt = []
+    touched = False
+    for kcid, raw in children:
+        if kcid == OBJECT:
+            new_obj, obj_touched = next(patched)
+            if not obj_touched:
+                new_obj = [raw]  # the worker sends nothing back for an untouched object
+            rebuilt.extend(new_obj)
+            touched = touched or obj_touched
+        else:
+            rebuilt.append(raw)
+    return chunk_pieces(OBJECTINFO, rebuilt), touched
+
+
+def patch_file_numeric(src_path: Path, dst_path: Path, channel: int = 1, optimize_cache: bool = False,
+                       jobs: int = 1):
+    # Map the input read-only: chunks are paged in on demand and every
+    # preserved chunk below is a view of the mapping, not a copy. Read it
+    # instead when it is empty (mmap refuses) or is also the output (the
+    # write would truncate the pages still being viewed).
+    with src_path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size and not (dst_path.exists() and os.path.samefile(src_path, dst_path)):
+            src_buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            src_buf = f.read()
+    data = memoryview(src_buf)
 
     # PRIMARY
     ch0 = read_chunk_header(data, 0)
     if not ch0 or ch0[0] != PRIMARY:
         raise RuntimeError("Not a 3DS/I3D-like file (PRIMARY missing).")
     _, ln0 = ch0
-    prim_children = find_children(data, 6, ln0)
-
-    # Locate OBJECTINFO
-    oi_idx = None
-    for i, (cid, start, ln, body) in enumerate(prim_children):
-        if cid == OBJECTINFO:
-            oi_idx = i
-            oi_start, oi_len, oi_body, oi_end = start, ln, body, start + ln
-            break
-    if oi_idx is None:
-        raise RuntimeError("OBJECTINFO (0x3D3D) not found.")
-
-    # Rebuild every OBJECT under OBJECTINFO
-    oi_children = find_children(data, oi_body, oi_end)
-    rebuilt_oi_children = []
-    touched = False
 
-    for kcid, start, ln, body in oi_children:
-        raw = bytes(data[start:start+ln])
-        if kcid == OBJECT:
-            new_obj = patch_object_numeric(raw, channel)
-            rebuilt_oi_children.append(new_obj)
-            if new_obj != raw:
-                touched = True
+    # Single pass over PRIMARY: the first OBJECTINFO is rebuilt in place,
+    # every other child is kept as a view of the original bytes
+    rebuilt_prim_children = []
+    found = touched = False
+    for cid, start, ln, body in iter_children(data, 6, ln0):
+        if cid == OBJECTINFO and not found:
+            found = True
+            new_oi, touched = patch_objectinfo_numeric(data, body, start + ln, channel, optimize_cache, jobs)
+            rebuilt_prim_children.extend(new_oi)
         else:
-            rebuilt_oi_children.append(raw)
+            rebuilt_prim_children.append(data[start:start+ln])
+    if not found:
+        raise RuntimeError("OBJECTINFO (0x3D3D) not found.")
 
     if not touched:
-        # Nothing changed; write original to dst
-        dst_path.write_bytes(bytes(data))
+        # Nothing changed; let the OS copy the original to dst
+        try:
+            shutil.copyfile(src_path, dst_path)
+        except shutil.SameFileError:
+            pass  # dst is the source itself, already identical
         return
 
-    # Rewrap into OBJECTINFO
-    new_oi = write_chunk(OBJECTINFO, b"".join(rebuilt_oi_children))
-
-    # Replace old OBJECTINFO in PRIMARY (preserving other primary children)
-    rebuilt_prim_children = []
-    for i, (cid, start, ln, body) in enumerate(prim_children):
-        if i == oi_idx:
-            rebuilt_prim_children.append(new_oi)
+    # Stream the pieces; the full PRIMARY is never concatenated in memory.
+    # The 1 MiB buffer coalesces the many small headers and name pieces.
+    with dst_path.open("wb", buffering=1 << 20) as f:
+        f.writelines(chunk_pieces(PRIMARY, rebuilt_prim_children))
+
+
+def expand_inputs(specs: List[str], suffix: str) -> List[Path]:
+    """Directories expand to their *suffix files, unmatched paths with wildcards to glob hits."""
+    paths: List[Path] = []
+    for spec in specs:
+        p = Path(spec)
+        if p.is_dir():
+            paths.extend(sorted(q for q in p.iterdir() if q.is_file() and q.suffix.lower() == suffix))
+        elif not p.exists() and glob.has_magic(spec):
+            paths.extend(Path(q) for q in sorted(glob.glob(spec, recursive=True)))
         else:
-            rebuilt_prim_children.append(bytes(data[start:start+ln]))
-
-    new_primary = write_chunk(PRIMARY, b"".join(rebuilt_prim_children))
-    dst_path.write_bytes(new_primary)
-
+            paths.append(p)
+    # a file named twice (overlapping globs, a directory and a glob) is converted once
+    seen = set()
+    unique: List[Path] = []
+    for p in paths:
+        key = p.resolve()
+        if key not in seen:
+            seen.add(key)
+            unique.append(p)
+    return unique
+
+def find_output_clash(jobs) -> Optional[str]:
+    """Batch jobs are (input, output, ...) tuples; name the first two inputs sharing an output."""
+    owner = {}
+    for src, dst, *_ in jobs:
+        prev = owner.setdefault(dst.resolve(), src)
+        if prev is not src:
+            return f"{prev} and {src} would both be written to {dst}"
+    return None
+
+def _patch_job(job) -> Optional[str]:
+    # Batch worker: report failures instead of tearing down the whole pool.
+    src, dst, channel, optimize_cache = job
+    try:
+        print(f"[PATCH] Reading: {src}")
+        patch_file_numeric(src, dst, channel=channel, optimize_cache=optimize_cache)
+        print(f"[OK] Wrote: {dst}")
+    except Exception as e:
+        return f"{src}: {type(e).__name__}: {e}"
+    return None
 
 def main():
     ap = argparse.ArgumentParser(description="Patch ALL OBJECT_MESH UVs (0x4140) into I3D FACE_MAP_CHANNEL (0x4200) with numeric subchunk ordering (safe mode).")
-    ap.add_argument("input", help="Path to input .3ds")
-    ap.add_argument("-o", "--output", help="Path to output .i3d (default: alongside source)")
+    ap.add_argument("input", nargs="+", help="Path to input .3ds (several files, a directory or a glob patch in batch)")
+    ap.add_argument("-o", "--output", help="Path to output .i3d, or output directory in batch mode (default: alongside source)")
     ap.add_argument("--channel", type=int, default=1, help="FACE_MAP_CHANNEL index to write (default: 1)")
+    ap.add_argument("--optimize-cache", action="store_true", help="Reorder faces of converted meshes for vertex-cache reuse (Forsyth)")
+    ap.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes: one file each in batch mode (default: CPU count), "
+                                                                 "or the OBJECTs of a single file (default: 1)")
     args = ap.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        ap.error("-j/--jobs must be at least 1")
 
-    src = Path(args.input)
-    if not src.exists():
-        print(f"ERROR: not found: {src}")
+    inputs = expand_inputs(args.input, ".3ds")
+    if not inputs:
+        print(f"ERROR: no .3ds files matched: {' '.join(args.input)}")
         sys.exit(2)
-    dst = Path(args.output) if args.output else src.with_suffix(".i3d")
+    for src in inputs:
+        if not src.exists():
+            print(f"ERROR: not found: {src}")
+            sys.exit(2)
+
+    if inputs == [Path(args.input[0])] and len(args.input) == 1:
+        src = inputs[0]
+        dst = Path(args.output) if args.output else src.with_suffix(".i3d")
+
+        print(f"[PATCH] Reading: {src}")
+        patch_file_numeric(src, dst, channel=args.channel, optimize_cache=args.optimize_cache, jobs=args.jobs or 1)
+        print(f"[OK] Wrote: {dst}")
+        return
 
-    print(f"[PATCH] Reading: {src}")
-    patch_file_numeric(src, dst, channel=args.channel)
-    print(f"[OK] Wrote: {dst}")
+    # Batch: every file is patched independently, one per worker.
+    out_dir = Path(args.output) if args.output else None
+    if out_dir and (out_dir.suffix.lower() == ".i3d" or out_dir.is_file()):
+        print(f"ERROR: -o must be a directory when several inputs are given: {out_dir}")
+        sys.exit(2)
+    jobs = [(p, (out_dir / p.name if out_dir else p).with_suffix(".i3d"), args.channel, args.optimize_cache)
+            for p in inputs]
+    clash = find_output_clash(jobs)
+    if clash:
+        print(f"ERROR: {clash}")
+        sys.exit(2)
+    if out_dir:
+        try:
+            out_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            print(f"ERROR: cannot create output directory {out_dir}: {e}")
+            sys.exit(2)
+    # imported here: the pool machinery costs ~25 ms of start-up that a
+    # single-file run should not pay
+    from concurrent.futures import ProcessPoolExecutor
+    workers = args.jobs or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        errors = [err for err in ex.map(_patch_job, jobs, chunksize=chunksize) if err]
+    for err in errors:
+        print(f"ERROR: {err}")
+    print(f"[OK] Patched {len(jobs) - len(errors)}/{len(jobs)} file(s)")
+    if errors:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -21,10 +21,13 @@ Design:
 - Structural/header lines go to the text dump only (via dump_line).
 - “Value” lines (actual data like vertices, faces, materials, UVs, KF keys, etc.)
   are emitted to the dump AND collected for JSON (via value_line).
-- Value lines are attached to the chunk index currently being handled.
+- Value lines are attached to the chunk index each handler is given (to_idx).
 
 Usage:
-  python i3d_analyzer.py file.i3d
+  python i3d_analyzer.py [--summary] file.i3d
+
+  --summary   report.json gets one min/max range line per vertex/face/UV/UV-face
+              array instead of the per-element lines; the text dump is unchanged
 
 Notes:
 - Built and tested on static I3D/3DS-like chunks. Animation/maps have limited coverage.
@@ -33,39 +36,119 @@ Notes:
 
 import os
 import sys
+import mmap
 import struct
 import json
-from collections import defaultdict
+from array import array
+from collections import Counter, defaultdict
 from pathlib import Path
 
 # -----------------------------
 # I/O helpers
 # -----------------------------
-def read_chunk(f):
-    hdr = f.read(6)
-    if len(hdr) < 6:
+CHUNK_HDR = struct.Struct("<HI")  # chunk id, total size incl. header (read per chunk)
+U8        = struct.Struct("<B")
+U16       = struct.Struct("<H")
+U32       = struct.Struct("<I")
+F32       = struct.Struct("<f")
+VEC3      = struct.Struct("<fff")     # points, colors, pivots, pos/scale keys
+ROT_KEY   = struct.Struct("<ffff")    # angle + axis
+BBOX      = struct.Struct("<ffffff")  # min xyz, max xyz
+XFORM_12F = struct.Struct("<12f")     # 0x4160 placement matrix
+FMC_HDR   = struct.Struct("<IH")      # 0x4200 channel index, UV count
+FACE      = struct.Struct("<HHHH")    # 0x4120 a, b, c, flags
+UV_FACE   = struct.Struct("<HHH")     # 0x4200 a, b, c
+UV        = struct.Struct("<ff")
+RECT16    = struct.Struct("<hhhh")    # viewport rect l, t, r, b
+RECT32    = struct.Struct("<iiii")
+TRACK_HDR = struct.Struct("<HIII")    # KF track flags, u1, u2, key count
+KEY_HDR   = struct.Struct("<IH")      # KF key frame, flags
+KEY_VEC3  = struct.Struct("<IHfff")   # KF pos/scale key without TCB/ease extras
+KEY_ROT   = struct.Struct("<IHffff")  # KF rot key without TCB/ease extras
+NODE_TAIL = struct.Struct("<HHH")     # KF node header flag1, flag2, parent id
+
+class Reader:
+    """
+    Cursor over the whole input: mv is a memoryview of the file (memory-mapped),
+    pos the current offset. read() keeps file.read semantics (short at EOF, the
+    position never moves past the end) and returns a view, not a copy.
+    """
+    __slots__ = ("mv", "pos", "size")
+
+    def __init__(self, mv):
+        self.mv = mv
+        self.pos = 0
+        self.size = len(mv)
+
+    def read(self, n):
+        start = self.pos
+        end = start + n
+        if end > self.size:
+            end = self.size if start < self.size else start
+        self.pos = end
+        return self.mv[start:end]
+
+    def fit(self, size, count):
+        """How many of count size-byte records from pos on lie inside the file."""
+        return min(count, max(0, self.size - self.pos) // size)
+
+def read_records(r, typecode, width, count):
+    """
+    Up to count records of width little-endian typecode items at r.pos, decoded
+    in one go into a flat array; stops at the last record inside the file.
+    """
+    arr = array(typecode)
+    start = r.pos
+    end = start + r.fit(arr.itemsize * width, count) * arr.itemsize * width
+    arr.frombytes(r.mv[start:end])
+    if sys.byteorder != "little":
+        arr.byteswap()
+    r.pos = end
+    return arr
+
+def _short_read(r, st):
+    """A record cut off by EOF: raise the struct.error a short file read gives."""
+    st.unpack(r.read(st.size))
+
+def open_reader(f):
+    """Map an open binary file read-only; empty files (mmap refuses them) read as b""."""
+    if os.fstat(f.fileno()).st_size == 0:
+        return Reader(memoryview(b""))
+    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+        mm.madvise(mmap.MADV_SEQUENTIAL)  # the walk is front to back: read ahead
+    return Reader(memoryview(mm))
+
+def read_chunk(r):
+    pos = r.pos
+    if pos + 6 > r.size:
+        r.read(6)  # consume the short tail like a file read would
         return None
-    return struct.unpack("<HI", hdr)
+    r.pos = pos + 6
+    return CHUNK_HDR.unpack_from(r.mv, pos)
 
 def read_cstr_from_bytes(buf, start, limit):
-    end = start
-    while end < limit and buf[end] != 0:
-        end += 1
-    if end >= limit:
+    seg = bytes(buf[start:limit])  # buf may be a memoryview (no .find)
+    end = seg.find(b"\x00")
+    if end < 0:
         return None, start
     try:
-        s = bytes(buf[start:end]).decode("ascii", errors="replace")
+        s = seg[:end].decode("ascii", errors="replace")
     except Exception:
-        s = bytes(buf[start:end]).decode("latin1", errors="replace")
-    return s, end + 1
-
-def read_cstr(f):
-    bs = bytearray()
-    while True:
-        b = f.read(1)
-        if not b or b == b"\x00":
-            break
-        bs += b
+        s = seg[:end].decode("latin1", errors="replace")
+    return s, start + end + 1
+
+def read_cstr(r):
+    """NUL-terminated string at r.pos; the terminator is consumed, EOF ends it too."""
+    start = r.pos
+    if start >= r.size:
+        return ""
+    end = r.mv.obj.find(b"\x00", start, r.size)  # mmap (or b"") scans in C
+    if end < 0:
+        end = r.pos = r.size
+    else:
+        r.pos = end + 1
+    bs = bytes(r.mv[start:end])
     try:
         return bs.decode("ascii", errors="replace")
     except Exception:
@@ -76,14 +159,12 @@ def read_cstr(f):
 # -----------------------------
 def fmtf(x):
     """Nice float formatter: trims noise while keeping detail."""
-    if x is None:
-        return "0"
-    if abs(x) < 1e-7:
+    if x is None or -1e-7 < x < 1e-7:
         return "0"
-    s = f"{x:.6g}"
-    if s.endswith("."):
-        s = s[:-1]
-    return s
+    # Whole numbers below 1e6 print the same under .6g; skip the float format
+    if type(x) is float and x.is_integer() and -1e6 < x < 1e6:
+        return str(int(x))
+    return f"{x:.6g}"  # .6g never leaves a trailing "."
 
 def fmt3(a, b, c):
     return f"({fmtf(a)}, {fmtf(b)}, {fmtf(c)})"
@@ -91,22 +172,36 @@ def fmt3(a, b, c):
 # -----------------------------
 # Dump vs JSON line capture
 # -----------------------------
-LINES_MAP = defaultdict(list)   # chunk_index -> [value lines]
-_CURRENT_CHUNK_IDX_STACK = []   # for scoping
-
-def _current_chunk_idx():
-    return _CURRENT_CHUNK_IDX_STACK[-1] if _CURRENT_CHUNK_IDX_STACK else None
-
+CHUNK_LINES = []                # chunk_index -> [value lines], one list per registered chunk
+SUMMARY_MODE = False            # --summary: per-element mesh lines reach the dump only
 def dump_line(out, depth, text):
     """Write only to the text dump (NOT to JSON)."""
     out.write(("\t" * depth) + text + "\n")
 
 def value_line(out, depth, text, *, to_idx=None):
-    """Write to the text dump AND record as a value line for JSON."""
+    """Write to the text dump AND record as a value line for JSON (under to_idx;
+    without one the line only reaches the dump)."""
     out.write(("\t" * depth) + text + "\n")
-    idx = to_idx if to_idx is not None else _current_chunk_idx()
-    if idx is not None:
-        LINES_MAP[idx].append(text)
+    if to_idx is not None:
+        CHUNK_LINES[to_idx].append(text)
+
+def value_lines(out, depth, texts, *, to_idx=None):
+    """Batch form of value_line for per-element arrays: one write, one extend."""
+    if not texts:
+        return
+    tabs = "\t" * depth
+    out.write(tabs + ("\n" + tabs).join(texts) + "\n")
+    if to_idx is not None:
+        CHUNK_LINES[to_idx].extend(texts)
+
+def array_summary(to_idx, values, width, ncols, label, fmt=fmtf):
+    """Summary mode: record for JSON, in place of the per-element lines, a single
+    min/max line over the first `ncols` columns of `values` (records are `width` wide)."""
+    if len(values) >= width:
+        cols = [values[i::width] for i in range(ncols)]
+        lo = ", ".join(fmt(min(c)) for c in cols)
+        hi = ", ".join(fmt(max(c)) for c in cols)
+        CHUNK_LINES[to_idx].append(f"{label}: min=({lo}) max=({hi})")
 
 def dump_hex_preview(out, depth, data, max_bytes=64):
     show = data[:max_bytes]
@@ -117,45 +212,45 @@ def dump_hex_preview(out, depth, data, max_bytes=64):
 # -----------------------------
 # Percent & color readers
 # -----------------------------
-def _read_color_block(f, sub_end):
-    pos0 = f.tell()
-    inner = read_chunk(f)
+def _read_color_block(r, sub_end):
+    pos0 = r.pos
+    inner = read_chunk(r)
     if not inner:
-        f.seek(sub_end)
+        r.pos = sub_end
         return None
     cid, ln = inner
     if ln < 6 or pos0 + ln > sub_end:
-        f.seek(pos0 + ln if ln >= 6 else sub_end)
+        r.pos = pos0 + ln if ln >= 6 else sub_end
         return None
     if cid == 0x0011 and ln >= 9:
-        rgb = f.read(3)
-        f.seek(pos0 + ln)
+        rgb = r.read(3)
+        r.pos = pos0 + ln
         return tuple(int(b) for b in rgb)
     elif cid in (0x0010, 0x0013) and ln >= 18:
-        r, g, b = struct.unpack("<fff", f.read(12))
-        f.seek(pos0 + ln)
+        red, green, blue = VEC3.unpack(r.read(12))
+        r.pos = pos0 + ln
         clamp = lambda x: int(max(0, min(255, round(x * 255))))
-        return (clamp(r), clamp(g), clamp(b))
-    f.seek(pos0 + ln)
+        return (clamp(red), clamp(green), clamp(blue))
+    r.pos = pos0 + ln
     return None
 
-def _read_pct_block(f, sub_end):
-    pos = f.tell()
-    inner = read_chunk(f)
+def _read_pct_block(r, sub_end):
+    pos = r.pos
+    inner = read_chunk(r)
     if not inner:
         return None
     icid, ln = inner
     if ln < 6 or pos + ln > sub_end:
         return None
     if icid == 0x0030 and ln >= 8:
-        v = struct.unpack("<H", f.read(2))[0]
-        f.seek(pos + ln)
+        v = U16.unpack(r.read(2))[0]
+        r.pos = pos + ln
         return v
     if icid == 0x0031 and ln >= 10:
-        v = struct.unpack("<f", f.read(4))[0]
-        f.seek(pos + ln)
+        v = F32.unpack(r.read(4))[0]
+        r.pos = pos + ln
         return round(v * 100.0, 2)
-    f.seek(pos + ln)
+    r.pos = pos + ln
     return None
 
 # -----------------------------
@@ -254,32 +349,41 @@ CID_REG.update({
 
 REF = {cid: meta["name"] for cid, meta in CID_REG.items()}
 
+class _CidNames(dict):
+    """REF plus UNKNOWN_XXXX names, each formatted on first lookup and kept."""
+    __slots__ = ()
+
+    def __missing__(self, cid):
+        name = self[cid] = f"UNKNOWN_{cid:04X}"
+        return name
+
+CID_NAMES = _CidNames(REF)
+
+# The registry is fixed after import: resolve each strategy to a set once so the
+# per-chunk predicates are a single membership test
+_FLAT = frozenset(cid for cid, meta in CID_REG.items() if meta["strategy"] == "flat")
+_CONTAINER = frozenset(cid for cid, meta in CID_REG.items() if meta["strategy"] == "container")
+_NOT_AUTO = frozenset(cid for cid, meta in CID_REG.items() if meta["strategy"] != "auto")
+
 def cid_name(cid: int) -> str:
-    meta = CID_REG.get(cid)
-    return meta["name"] if meta else f"UNKNOWN_{cid:04X}"
+    return CID_NAMES[cid]
 
 def is_flat_chunk(cid: int) -> bool:
-    meta = CID_REG.get(cid)
-    return meta is not None and meta.get("strategy") == "flat"
+    return cid in _FLAT
 
 def is_container_chunk(cid: int) -> bool:
-    meta = CID_REG.get(cid)
-    return meta is not None and meta.get("strategy") == "container"
+    return cid in _CONTAINER
 
 def is_auto_chunk(cid: int) -> bool:
-    meta = CID_REG.get(cid)
-    return meta is None or meta.get("strategy") == "auto"
+    return cid not in _NOT_AUTO  # unregistered IDs count as auto
 
-def maybe_nested(f, region_end, parent_cid=None):
-    if parent_cid is not None and is_flat_chunk(parent_cid):
-        return False
-    pos = f.tell()
-    if region_end - pos < 6:
+def maybe_nested(r, region_end, parent_cid=None):
+    if parent_cid in _FLAT:  # None is never registered
         return False
-    peek = f.read(6); f.seek(pos)
-    if len(peek) < 6:
+    pos = r.pos
+    if region_end - pos < 6 or pos + 6 > r.size:
         return False
-    inner_id, inner_len = struct.unpack("<HI", peek)
+    inner_id, inner_len = CHUNK_HDR.unpack_from(r.mv, pos)
     return inner_len >= 6 and (pos + inner_len) <= region_end
 
 # -----------------------------
@@ -305,7 +409,7 @@ def _parse_viewport_tail(tail_bytes, view_type):
 
     def _read_float_at(o):
         if o + 4 <= n:
-            (v,) = struct.unpack_from("<f", buf, o)
+            (v,) = F32.unpack_from(buf, o)
             if v == v and abs(v) < 1e12:
                 return v
         return None
@@ -316,13 +420,13 @@ def _parse_viewport_tail(tail_bytes, view_type):
 
     def _read_rect_int16(o):
         if o + 8 <= n:
-            l, t, r, b = struct.unpack_from("<hhhh", buf, o)
+            l, t, r, b = RECT16.unpack_from(buf, o)
             return l, t, r, b
         return None
 
     def _read_rect_int32(o):
         if o + 16 <= n:
-            l, t, r, b = struct.unpack_from("<iiii", buf, o)
+            l, t, r, b = RECT32.unpack_from(buf, o)
             return l, t, r, b
         return None
 
@@ -348,29 +452,61 @@ def _parse_viewport_tail(tail_bytes, view_type):
 # -----------------------------
 # Chunk bookkeeping
 # -----------------------------
+class ChunkTable:
+    """
+    Chunk records stored column-wise: chunk i is ids[i] at offsets[i], sizes[i]
+    bytes long, depths[i] deep, under parents[i] (-1 at top level). Children are
+    not tracked while parsing; children() derives them from parents afterwards.
+    """
+    __slots__ = ("ids", "offsets", "sizes", "depths", "parents")
+
+    def __init__(self):
+        self.ids = array("H")
+        self.offsets = array("Q")
+        self.sizes = array("I")
+        self.depths = array("I")
+        self.parents = array("i")
+
+    def __len__(self):
+        return len(self.ids)
+
+    def children(self):
+        """CSR child lists: kids[ptr[i]:ptr[i + 1]] are chunk i's children in file order."""
+        n = len(self.ids)
+        ptr = array("I", [0]) * (n + 1)
+        for p in self.parents:
+            if p >= 0:
+                ptr[p + 1] += 1
+        for i in range(n):
+            ptr[i + 1] += ptr[i]
+        fill = array("I", ptr)
+        kids = array("I", [0]) * ptr[n]
+        for i, p in enumerate(self.parents):
+            if p >= 0:
+                kids[fill[p]] = i
+                fill[p] += 1
+        return ptr, kids
+
 def register_chunk(chunks, cid, length, offset, depth, parent):
-    idx = len(chunks)
-    chunks.append({
-        "index": idx, "id": cid, "offset": offset, "size": length,
-        "depth": depth, "parent": parent, "children": [],
-        "payload_start": offset + 6, "payload_end": offset + length
-    })
-    if parent is not None and parent >= 0:
-        chunks[parent]["children"].append(idx)
-    _ = LINES_MAP[idx]  # ensure key exists
-    return idx
+    chunks.ids.append(cid)
+    chunks.offsets.append(offset)
+    chunks.sizes.append(length)
+    chunks.depths.append(depth)
+    chunks.parents.append(-1 if parent is None else parent)
+    CHUNK_LINES.append([])
+    return len(chunks.ids) - 1
 
 # -----------------------------
 # Specialized handlers
 # -----------------------------
-def decode_m3d_version(f, ln, depth, out, *, to_idx):
+def decode_m3d_version(r, ln, depth, out, chunks, anomalies, to_idx):
     if ln >= 10 and to_idx is not None:
-        v = struct.unpack("<I", f.read(4))[0]
+        v = U32.unpack(r.read(4))[0]
         value_line(out, depth, f"M3D Version: {v}", to_idx=to_idx)
 
-def decode_mesh_version(f, ln, depth, out, *, to_idx):
+def decode_mesh_version(r, ln, depth, out, chunks, anomalies, to_idx):
     if ln >= 10 and to_idx is not None:
-        v = struct.unpack("<I", f.read(4))[0]
+        v = U32.unpack(r.read(4))[0]
         value_line(out, depth, f"Mesh Version: {v}", to_idx=to_idx)
 
 def _is_printable(s: str) -> bool:
@@ -378,429 +514,485 @@ def _is_printable(s: str) -> bool:
         return False
     return all((ord(c) >= 32 or c in "\t\n\r") for c in s)
 
-def decode_kfhdr(f, ln, depth, out, *, to_idx):
-    start = f.tell() - 6; end = start + ln
-    name = read_cstr(f)
+def decode_kfhdr(r, ln, depth, out, chunks, anomalies, to_idx):
+    name = read_cstr(r)
     if to_idx is not None and _is_printable(name):
         value_line(out, depth, f"KFHDR name: {name}", to_idx=to_idx)
-    f.seek(end)
 
-def decode_kfcurtime_range(f, ln, depth, out, *, to_idx):
-    start = f.tell() - 6; end = start + ln
+def decode_kfcurtime_range(r, ln, depth, out, chunks, anomalies, to_idx):
+    start = r.pos - 6; end = start + ln
     vals = []
-    while f.tell() + 4 <= end and len(vals) < 2:
-        vals.append(struct.unpack("<I", f.read(4))[0])
+    while r.pos + 4 <= end and len(vals) < 2:
+        vals.append(U32.unpack(r.read(4))[0])
     if to_idx is not None and vals:
         if len(vals) >= 2:
             value_line(out, depth, f"TIME_RANGE: start={vals[0]} end={vals[1]}", to_idx=to_idx)
         else:
             value_line(out, depth, f"TIME_RANGE: start={vals[0]}", to_idx=to_idx)
-    f.seek(end)
 
-def decode_kfcurtime(f, ln, depth, out, *, to_idx):
-    start = f.tell() - 6; end = start + ln
+def decode_kfcurtime(r, ln, depth, out, chunks, anomalies, to_idx):
+    start = r.pos - 6; end = start + ln
     cur = None
-    if f.tell() + 4 <= end:
-        (cur,) = struct.unpack("<I", f.read(4))
+    if r.pos + 4 <= end:
+        (cur,) = U32.unpack(r.read(4))
     if to_idx is not None and cur is not None:
         value_line(out, depth, f"CURTIME: {cur}", to_idx=to_idx)
-    f.seek(end)
 
-def handle_material_texmap(f, ln, depth, out, chunks, anomalies, parent_idx):
-    start = f.tell() - 6; end = start + ln
-    while f.tell() < end:
-        at = f.tell()
-        sub = read_chunk(f)
-        if not sub: break
-        scid, slen = sub
-        sidx = register_chunk(chunks, scid, slen, at, depth, parent_idx)
-        sub_end = at + slen
-        _CURRENT_CHUNK_IDX_STACK.append(sidx)
-        try:
-            dump_line(out, depth, f"{cid_name(scid)} (ID: 0x{scid:04X}, Length: {slen}) at Pos: {at}")
-            if scid == 0x0030 and slen >= 8:
-                pct = _read_pct_block(f, sub_end)
-                if pct is not None:
-                    value_line(out, depth, f"Map Amount: {pct}%", to_idx=sidx)
-            elif scid == 0xA300:
-                value_line(out, depth, f"Texture File: {read_cstr(f)}", to_idx=sidx)
-            elif scid == 0xA351 and slen >= 8:
-                til = struct.unpack("<H", f.read(2))[0]
-                value_line(out, depth, f"Tiling Flags: 0x{til:04X}", to_idx=sidx)
-            elif scid == 0xA353 and slen >= 10:
-                blur = struct.unpack("<f", f.read(4))[0]
-                value_line(out, depth, f"Texture Blur: {fmtf(blur)}", to_idx=sidx)
-            else:
-                if scid in CID_REG and (is_container_chunk(scid) or is_auto_chunk(scid) and maybe_nested(f, sub_end, scid)):
-                    process_region(f, f.tell(), sub_end, depth + 1, out, chunks, anomalies, sidx)
-                else:
-                    data = f.read(max(0, slen - 6))
-                    dump_line(out, depth, f"Unknown TexMap 0x{scid:04X}")
-                    if data: dump_hex_preview(out, depth + 1, data)
-        finally:
-            _CURRENT_CHUNK_IDX_STACK.pop()
-            f.seek(sub_end)
-    f.seek(end)
-
-def handle_material(f, ln, depth, out, chunks, anomalies, parent_idx):
-    start = f.tell() - 6; end = start + ln
-    while f.tell() < end:
-        at = f.tell()
-        sub = read_chunk(f)
+# -------- Sub-chunk walker (material / texmap / mesh / KF node) --------
+def walk_subchunks(r, ln, depth, out, chunks, anomalies, parent_idx, leaves, fallback):
+    """
+    Loop shared by the handlers below: register and dump every sub-chunk, then
+    dispatch through the handler's jump table. `leaves` maps an ID to
+    (min_len, leaf); IDs not in it, or too short for their entry, go to fallback.
+    Leaves start at the payload and may stop anywhere: the walker moves on to
+    the next sub-chunk itself.
+    """
+    start = r.pos - 6; end = start + ln
+    leaves_get, names = leaves.get, CID_NAMES
+    while r.pos < end:
+        at = r.pos
+        sub = read_chunk(r)
         if not sub: break
         scid, slen = sub
         sidx = register_chunk(chunks, scid, slen, at, depth, parent_idx)
         sub_end = at + slen
-        _CURRENT_CHUNK_IDX_STACK.append(sidx)
-        try:
-            dump_line(out, depth, f"{cid_name(scid)} (ID: 0x{scid:04X}, Length: {slen}) at Pos: {at}")
-            if scid == 0xA000:
-                value_line(out, depth, f"Material Name: {read_cstr(f)}", to_idx=sidx)
-            elif scid in (0xA010, 0xA020, 0xA030):
-                rgb = _read_color_block(f, sub_end)
-                label = {0xA010: "Ambient", 0xA020: "Diffuse", 0xA030: "Specular"}[scid]
-                if rgb:
-                    value_line(out, depth, f"{label}: #{rgb[0]:02X}{rgb[1]:02X}{rgb[2]:02X}", to_idx=sidx)
-            elif scid in (0xA040, 0xA041, 0xA050, 0xA052, 0xA053, 0xA084):
-                label = {
-                    0xA040: "Shininess", 0xA041: "Shine Strength", 0xA050: "Transparency",
-                    0xA052: "Transp Falloff", 0xA053: "Ref Blur", 0xA084: "Self Illumination",
-                }[scid]
-                pct = _read_pct_block(f, sub_end)
-                if pct is not None:
-                    value_line(out, depth, f"{label}: {pct}%", to_idx=sidx)
-                else:
-                    if scid == 0xA053 and (sub_end - f.tell()) >= 4:
-                        try:
-                            v = struct.unpack("<f", f.read(4))[0]
-                            value_line(out, depth, f"{label} (float): {fmtf(v)}", to_idx=sidx)
-                        except Exception:
-                            pass
-            elif scid == 0xA081 and slen == 6:
-                value_line(out, depth, "Two-sided: ON", to_idx=sidx)            
-            elif scid == 0xA08A and slen == 6:
-                value_line(out, depth, "Opacity Falloff: IN (flag)", to_idx=sidx)
-            elif scid == 0xA08C and slen == 6:
-                value_line(out, depth, "Soften: ON", to_idx=sidx)
-            elif scid == 0xA087 and slen >= 10:
-                v = struct.unpack("<f", f.read(4))[0]
-                value_line(out, depth, f"Wire Size: {fmtf(v)}", to_idx=sidx)
-            elif scid == 0xA100 and slen >= 8:
-                mode = struct.unpack("<H", f.read(2))[0]
-                table = {0: "Wireframe", 1: "Flat", 2: "Gouraud", 3: "Phong", 4: "Metal"}
-                value_line(out, depth, f"Shading: {table.get(mode, f'Unknown({mode})')}", to_idx=sidx)
-            elif scid == 0xA200:
-                handle_material_texmap(f, slen, depth + 1, out, chunks, anomalies, sidx)
-            else:
-                if scid in CID_REG and (is_container_chunk(scid) or is_auto_chunk(scid) and maybe_nested(f, sub_end, scid)):
-                    process_region(f, f.tell(), sub_end, depth + 1, out, chunks, anomalies, sidx)
-        finally:
-            _CURRENT_CHUNK_IDX_STACK.pop()
-            f.seek(sub_end)
-    f.seek(end)
-
-def handle_object_name(f, ln, depth, out, chunks, anomalies, parent_idx):
-    start = f.tell() - 6; end = start + ln
-    name = read_cstr(f)
+        dump_line(out, depth, f"{names[scid]} (ID: 0x{scid:04X}, Length: {slen}) at Pos: {at}")
+        entry = leaves_get(scid)
+        if entry is not None and slen >= entry[0]:
+            entry[1](r, scid, slen, sub_end, depth, out, sidx, chunks, anomalies)
+        else:
+            fallback(r, scid, slen, sub_end, depth, out, sidx, chunks, anomalies)
+        r.pos = sub_end
+
+def _descend(r, scid, sub_end, depth, out, sidx, chunks, anomalies):
+    """Walk the children of a registered container (or nested auto) sub-chunk; False if it has none."""
+    if scid in CID_REG and (scid in _CONTAINER or scid not in _NOT_AUTO and maybe_nested(r, sub_end, scid)):
+        process_region(r, r.pos, sub_end, depth, out, chunks, anomalies, sidx)
+        return True
+    return False
+
+def _other_one_down(r, scid, slen, sub_end, depth, out, sidx, chunks, anomalies):
+    _descend(r, scid, sub_end, depth + 1, out, sidx, chunks, anomalies)
+
+def _other_two_down(r, scid, slen, sub_end, depth, out, sidx, chunks, anomalies):
+    _descend(r, scid, sub_end, depth + 2, out, sidx, chunks, anomalies)
+
+# -------- MAT_TEXMAP (0xA200) --------
+def _map_amount(r, scid, slen, sub_end, depth, out, sidx, *_):
+    pct = _read_pct_block(r, sub_end)
+    if pct is not None:
+        value_line(out, depth, f"Map Amount: {pct}%", to_idx=sidx)
+
+def _map_file(r, scid, slen, sub_end, depth, out, sidx, *_):
+    value_line(out, depth, f"Texture File: {read_cstr(r)}", to_idx=sidx)
+
+def _map_tiling(r, scid, slen, sub_end, depth, out, sidx, *_):
+    til = U16.unpack(r.read(2))[0]
+    value_line(out, depth, f"Tiling Flags: 0x{til:04X}", to_idx=sidx)
+
+def _map_blur(r, scid, slen, sub_end, depth, out, sidx, *_):
+    blur = F32.unpack(r.read(4))[0]
+    value_line(out, depth, f"Texture Blur: {fmtf(blur)}", to_idx=sidx)
+
+def _map_other(r, scid, slen, sub_end, depth, out, sidx, chunks, anomalies):
+    if not _descend(r, scid, sub_end, depth + 1, out, sidx, chunks, anomalies):
+        data = r.read(max(0, slen - 6))
+        dump_line(out, depth, f"Unknown TexMap 0x{scid:04X}")
+        if data: dump_hex_preview(out, depth + 1, data)
+
+TEXMAP_LEAVES = {
+    0x0030: (8, _map_amount),
+    0xA300: (0, _map_file),
+    0xA351: (8, _map_tiling),
+    0xA353: (10, _map_blur),
+}
+
+def handle_material_texmap(r, ln, depth, out, chunks, anomalies, parent_idx):
+    walk_subchunks(r, ln, depth, out, chunks, anomalies, parent_idx, TEXMAP_LEAVES, _map_other)
+
+# -------- MATERIAL (0xAFFF) --------
+MAT_COLOR_LABELS = {0xA010: "Ambient", 0xA020: "Diffuse", 0xA030: "Specular"}
+MAT_PCT_LABELS = {
+    0xA040: "Shininess", 0xA041: "Shine Strength", 0xA050: "Transparency",
+    0xA052: "Transp Falloff", 0xA053: "Ref Blur", 0xA084: "Self Illumination",
+}
+MAT_FLAG_LINES = {0xA081: "Two-sided: ON", 0xA08A: "Opacity Falloff: IN (flag)", 0xA08C: "Soften: ON"}
+MAT_SHADING = {0: "Wireframe", 1: "Flat", 2: "Gouraud", 3: "Phong", 4: "Metal"}
+
+def _mat_name(r, scid, slen, sub_end, depth, out, sidx, *_):
+    value_line(out, depth, f"Material Name: {read_cstr(r)}", to_idx=sidx)
+
+def _mat_color(r, scid, slen, sub_end, depth, out, sidx, *_):
+    rgb = _read_color_block(r, sub_end)
+    label = MAT_COLOR_LABELS[scid]
+    if rgb:
+        value_line(out, depth, f"{label}: #{rgb[0]:02X}{rgb[1]:02X}{rgb[2]:02X}", to_idx=sidx)
+
+def _mat_pct(r, scid, slen, sub_end, depth, out, sidx, *_):
+    label = MAT_PCT_LABELS[scid]
+    pct = _read_pct_block(r, sub_end)
+    if pct is not None:
+        value_line(out, depth, f"{label}: {pct}%", to_idx=sidx)
+    else:
+        if scid == 0xA053 and (sub_end - r.pos) >= 4:
+            try:
+                v = F32.unpack(r.read(4))[0]
+                value_line(out, depth, f"{label} (float): {fmtf(v)}", to_idx=sidx)
+            except Exception:
+                pass
+
+def _mat_flag(r, scid, slen, sub_end, depth, out, sidx, *_):
+    if slen == 6:  # a bare flag chunk; anything longer is left alone
+        value_line(out, depth, MAT_FLAG_LINES[scid], to_idx=sidx)
+
+def _mat_wire(r, scid, slen, sub_end, depth, out, sidx, *_):
+    v = F32.unpack(r.read(4))[0]
+    value_line(out, depth, f"Wire Size: {fmtf(v)}", to_idx=sidx)
+
+def _mat_shading(r, scid, slen, sub_end, depth, out, sidx, *_):
+    mode = U16.unpack(r.read(2))[0]
+    value_line(out, depth, f"Shading: {MAT_SHADING.get(mode, f'Unknown({mode})')}", to_idx=sidx)
+
+def _mat_texmap(r, scid, slen, sub_end, depth, out, sidx, chunks, anomalies):
+    handle_material_texmap(r, slen, depth + 1, out, chunks, anomalies, sidx)
+
+MATERIAL_LEAVES = {
+    0xA000: (0, _mat_name),
+    0xA010: (0, _mat_color), 0xA020: (0, _mat_color), 0xA030: (0, _mat_color),
+    0xA040: (0, _mat_pct), 0xA041: (0, _mat_pct), 0xA050: (0, _mat_pct),
+    0xA052: (0, _mat_pct), 0xA053: (0, _mat_pct), 0xA084: (0, _mat_pct),
+    0xA081: (0, _mat_flag), 0xA08A: (0, _mat_flag), 0xA08C: (0, _mat_flag),
+    0xA087: (10, _mat_wire),
+    0xA100: (8, _mat_shading),
+    0xA200: (0, _mat_texmap),
+}
+
+def handle_material(r, ln, depth, out, chunks, anomalies, parent_idx):
+    walk_subchunks(r, ln, depth, out, chunks, anomalies, parent_idx, MATERIAL_LEAVES, _other_one_down)
+
+def handle_object_name(r, ln, depth, out, chunks, anomalies, parent_idx):
+    start = r.pos - 6; end = start + ln
+    name = read_cstr(r)
     # name is a *value* of the OBJECT (0x4000) itself
     value_line(out, depth, f"Object Name: {name}", to_idx=parent_idx)
-    if f.tell() < end:
-        process_region(f, f.tell(), end, depth + 1, out, chunks, anomalies, parent_idx)
-    f.seek(end)
+    if r.pos < end:
+        process_region(r, r.pos, end, depth + 1, out, chunks, anomalies, parent_idx)
 
-def handle_object_material_flat(f, ln, depth, out, *, to_idx):
+def handle_object_material_flat(r, ln, depth, out, chunks, anomalies, to_idx):
     """0x4130: <cstr name><u16 count><count * u16 face_idx> (flat)."""
-    start = f.tell() - 6
+    start = r.pos - 6
     end = start + ln
-    name = read_cstr(f)
+    name = read_cstr(r)
     cnt = 0
-    if f.tell() + 2 <= end:
-        cnt = struct.unpack("<H", f.read(2))[0]
+    if r.pos + 2 <= end:
+        cnt = U16.unpack(r.read(2))[0]
     value_line(out, depth, f"Material name: {name}", to_idx=to_idx)
     value_line(out, depth, f"Number of faces using this material: {cnt}", to_idx=to_idx)
-    remaining = max(0, end - f.tell())
+    remaining = max(0, end - r.pos)
     read_cnt = min(cnt, remaining // 2)
-    for _ in range(read_cnt):
-        (face_idx,) = struct.unpack("<H", f.read(2))
-        value_line(out, depth + 1, f"Face index: {face_idx}", to_idx=to_idx)
+    idxs = read_records(r, "H", 1, read_cnt)
+    value_lines(out, depth + 1, [f"Face index: {face_idx}" for face_idx in idxs], to_idx=to_idx)
+    if len(idxs) < read_cnt:
+        _short_read(r, U16)
     if read_cnt < cnt:
         value_line(out, depth, f"[WARN] material face list truncated (read {read_cnt}/{cnt})", to_idx=to_idx)
-    f.seek(end)
 
-def handle_object_smooth_flat(f, ln, depth, out, *, to_idx):
+def handle_object_smooth_flat(r, ln, depth, out, chunks, anomalies, to_idx):
     """0x4150: u32 per face (flat)."""
-    start = f.tell() - 6
+    start = r.pos - 6
     end = start + ln
-    count = max(0, (end - f.tell()) // 4)
-    masks = []
-    for _ in range(count):
-        (mask,) = struct.unpack("<I", f.read(4))
-        masks.append(mask)
-    def first_group(m):
-        if m == 0: return "0"
-        for i in range(32):
-            if (m >> i) & 1:
-                return str(i + 1)
-        return "0"
+    count = max(0, (end - r.pos) // 4)
+    masks = read_records(r, "I", 1, count)
+    if len(masks) < count:
+        _short_read(r, U32)
     if masks:
-        display = ", ".join(first_group(m) for m in masks)
+        # first set group = index of the lowest set bit (1-based); 0 stays 0
+        display = ", ".join([str((m & -m).bit_length()) for m in masks])
         value_line(out, depth, f"Smoothing Groups: ({display})", to_idx=to_idx)
-    f.seek(end)
 
-def handle_object_mesh(f, ln, depth, out, chunks, anomalies, parent_idx):
-    start = f.tell() - 6
-    end = start + ln
-    while f.tell() < end:
-        at = f.tell()
-        sub = read_chunk(f)
-        if not sub: break
-        scid, slen = sub
-        sidx = register_chunk(chunks, scid, slen, at, depth, parent_idx)
-        sub_end = at + slen
-
-        _CURRENT_CHUNK_IDX_STACK.append(sidx)
-        try:
-            dump_line(out, depth, f"{cid_name(scid)} (ID: 0x{scid:04X}, Length: {slen}) at Pos: {at}")
-
-            if scid == 0x4110 and slen >= 8:
-                if f.tell() + 2 > sub_end:
-                    value_line(out, depth + 1, "Vertices: [truncated header]", to_idx=sidx)
-                    f.seek(sub_end); continue
-                vcount = struct.unpack("<H", f.read(2))[0]
-                value_line(out, depth + 1, f"Vertices: {vcount}", to_idx=sidx)
-                have = max(0, sub_end - f.tell())
-                read_cnt = min(vcount, have // 12)
-                for i in range(read_cnt):
-                    x, y, z = struct.unpack("<fff", f.read(12))
-                    value_line(out, depth + 1, f"Vertex[{i}]: {fmt3(x,y,z)}", to_idx=sidx)
-                if read_cnt < vcount:
-                    value_line(out, depth + 1, f"[WARN] vertex array truncated (read {read_cnt}/{vcount})", to_idx=sidx)
-                f.seek(sub_end)
-
-            elif scid == 0x4120 and slen >= 8:
-                if f.tell() + 2 > sub_end:
-                    value_line(out, depth + 1, "Faces: [truncated header]", to_idx=sidx)
-                    f.seek(sub_end); continue
-                num_faces = struct.unpack("<H", f.read(2))[0]
-                value_line(out, depth + 1, f"Faces: {num_faces}", to_idx=sidx)
-                entry_sz = 8
-                have = max(0, sub_end - f.tell())
-                read_cnt = min(num_faces, have // entry_sz)
-                for i in range(read_cnt):
-                    a, b, c, flags = struct.unpack("<HHHH", f.read(8))
-                    value_line(out, depth + 1, f"Face[{i}]: ({a}, {b}, {c}) flags=0x{flags:04X}", to_idx=sidx)
-                if read_cnt < num_faces:
-                    value_line(out, depth + 1, f"[WARN] face array truncated (read {read_cnt}/{num_faces})", to_idx=sidx)
-                if f.tell() < sub_end:
-                    process_region(f, f.tell(), sub_end, depth + 2, out, chunks, anomalies, sidx)
-                f.seek(sub_end)
-
-            elif scid == 0x4130:
-                handle_object_material_flat(f, slen, depth + 1, out, to_idx=sidx)
-                f.seek(sub_end)
-
-            elif scid == 0x4140 and slen >= 8:
-                if f.tell() + 2 > sub_end:
-                    value_line(out, depth + 1, "UVs: [truncated header]", to_idx=sidx)
-                    f.seek(sub_end); continue
-                uv_count = struct.unpack("<H", f.read(2))[0]
-                value_line(out, depth + 1, f"UV count: {uv_count}", to_idx=sidx)
-                have = max(0, sub_end - f.tell())
-                read_cnt = min(uv_count, have // 8)
-                for i in range(read_cnt):
-                    u, v = struct.unpack("<ff", f.read(8))
-                    value_line(out, depth + 1, f"UV[{i}]: ({fmtf(u)}, {fmtf(v)})", to_idx=sidx)
-                if read_cnt < uv_count:
-                    value_line(out, depth + 1, f"[WARN] UV array truncated (read {read_cnt}/{uv_count})", to_idx=sidx)
-                f.seek(sub_end)
-
-            elif scid == 0x4150:
-                handle_object_smooth_flat(f, slen, depth + 1, out, to_idx=sidx)
-                f.seek(sub_end)
-
-            elif scid == 0x4160 and slen >= 6 + 48:
-                mat = struct.unpack("<12f", f.read(48))
-                mat_fmt = ", ".join(fmtf(v) for v in mat)
-                value_line(out, depth + 1, f"Xform: ({mat_fmt})", to_idx=sidx)
-                f.seek(sub_end)
-
-            elif scid == 0x4165 and slen >= 7:
-                vis = struct.unpack("<B", f.read(1))[0]
-                value_line(out, depth + 1, f"Visible: {'yes' if vis else 'no'}", to_idx=sidx)
-                f.seek(sub_end)
-
-            elif scid == 0x4200 and slen >= 12:
-                if f.tell() + 6 > sub_end:
-                    value_line(out, depth + 1, "FACE_MAP_CHANNEL: [truncated header]", to_idx=sidx)
-                    f.seek(sub_end); continue
-                channel_i, uv_count = struct.unpack("<I H", f.read(6))
-                value_line(out, depth + 1, f"UV Channel: {channel_i}  count={uv_count}", to_idx=sidx)
-                uv_bytes = uv_count * 8
-                if f.tell() + uv_bytes > sub_end:
-                    need = uv_bytes; have = max(0, sub_end - f.tell())
-                    value_line(out, depth + 1, f"[WARN] 0x4200 UV list truncated (need {need}, have {have})", to_idx=sidx)
-                    f.seek(sub_end); continue
-                for i in range(uv_count):
-                    u, v = struct.unpack("<ff", f.read(8))
-                    value_line(out, depth + 1, f"UV[{i}]: ({fmtf(u)}, {fmtf(v)})", to_idx=sidx)
-                if f.tell() + 2 > sub_end:
-                    value_line(out, depth + 1, "[WARN] 0x4200 missing face-count", to_idx=sidx)
-                    f.seek(sub_end); continue
-                fcnt = struct.unpack("<H", f.read(2))[0]
-                faces_bytes = fcnt * 6
-                if f.tell() + faces_bytes > sub_end:
-                    got = max(0, sub_end - f.tell())
-                    value_line(out, depth + 1, f"[WARN] 0x4200 UV face list truncated (need {faces_bytes}, have {got})", to_idx=sidx)
-                    f.seek(sub_end); continue
-                for i in range(fcnt):
-                    a, b, c = struct.unpack("<HHH", f.read(6))
-                    value_line(out, depth + 1, f"UVFace[{i}]: ({a}, {b}, {c})", to_idx=sidx)
-                if f.tell() < sub_end:
-                    rem = sub_end - f.tell()
-                    if rem > 0:
-                        tail = f.read(min(32, rem))
-                        value_line(out, depth + 1, f"[info] 0x4200 trailing bytes: {rem} (first 32 shown)", to_idx=sidx)
-                        dump_hex_preview(out, depth + 2, tail)
-                f.seek(sub_end)
-
-            else:
-                if scid in CID_REG and (is_container_chunk(scid) or is_auto_chunk(scid) and maybe_nested(f, sub_end, scid)):
-                    process_region(f, f.tell(), sub_end, depth + 2, out, chunks, anomalies, sidx)
-                else:
-                    f.seek(sub_end)
-
-        finally:
-            _CURRENT_CHUNK_IDX_STACK.pop()
-            f.seek(sub_end)
+# -------- OBJECT_MESH (0x4100) --------
+def _mesh_vertices(r, scid, slen, sub_end, depth, out, sidx, chunks, anomalies):
+    if r.pos + 2 > sub_end:
+        value_line(out, depth + 1, "Vertices: [truncated header]", to_idx=sidx)
+        return
+    vcount = U16.unpack(r.read(2))[0]
+    value_line(out, depth + 1, f"Vertices: {vcount}", to_idx=sidx)
+    have = max(0, sub_end - r.pos)
+    read_cnt = min(vcount, have // 12)
+    verts = read_records(r, "f", 3, read_cnt)
+    it = map(fmtf, verts)  # format the flat array once, then regroup
+    value_lines(out, depth + 1, [f"Vertex[{i}]: ({x}, {y}, {z})"
+                                 for i, (x, y, z) in enumerate(zip(it, it, it))],
+                to_idx=None if SUMMARY_MODE else sidx)  # summary: JSON gets one range line
+    if SUMMARY_MODE:
+        array_summary(sidx, verts, 3, 3, "Vertex range")
+    if len(verts) < 3 * read_cnt:
+        _short_read(r, VEC3)
+    if read_cnt < vcount:
+        value_line(out, depth + 1, f"[WARN] vertex array truncated (read {read_cnt}/{vcount})", to_idx=sidx)
+
+def _mesh_faces(r, scid, slen, sub_end, depth, out, sidx, chunks, anomalies):
+    if r.pos + 2 > sub_end:
+        value_line(out, depth + 1, "Faces: [truncated header]", to_idx=sidx)
+        return
+    num_faces = U16.unpack(r.read(2))[0]
+    value_line(out, depth + 1, f"Faces: {num_faces}", to_idx=sidx)
+    entry_sz = 8
+    have = max(0, sub_end - r.pos)
+    read_cnt = min(num_faces, have // entry_sz)
+    faces = read_records(r, "H", 4, read_cnt)
+    it = iter(faces)
+    value_lines(out, depth + 1, [f"Face[{i}]: ({a}, {b}, {c}) flags=0x{flags:04X}"
+                                 for i, (a, b, c, flags) in enumerate(zip(it, it, it, it))],
+                to_idx=None if SUMMARY_MODE else sidx)  # summary: JSON gets one range line
+    if SUMMARY_MODE:
+        array_summary(sidx, faces, 4, 3, "Face index range", str)
+    if len(faces) < 4 * read_cnt:
+        _short_read(r, FACE)
+    if read_cnt < num_faces:
+        value_line(out, depth + 1, f"[WARN] face array truncated (read {read_cnt}/{num_faces})", to_idx=sidx)
+    if r.pos < sub_end:
+        process_region(r, r.pos, sub_end, depth + 2, out, chunks, anomalies, sidx)
+
+def _mesh_material(r, scid, slen, sub_end, depth, out, sidx, chunks, anomalies):
+    handle_object_material_flat(r, slen, depth + 1, out, chunks, anomalies, sidx)
+
+def _mesh_uvs(r, scid, slen, sub_end, depth, out, sidx, chunks, anomalies):
+    if r.pos + 2 > sub_end:
+        value_line(out, depth + 1, "UVs: [truncated header]", to_idx=sidx)
+        return
+    uv_count = U16.unpack(r.read(2))[0]
+    value_line(out, depth + 1, f"UV count: {uv_count}", to_idx=sidx)
+    have = max(0, sub_end - r.pos)
+    read_cnt = min(uv_count, have // 8)
+    uvs = read_records(r, "f", 2, read_cnt)
+    it = map(fmtf, uvs)
+    value_lines(out, depth + 1, [f"UV[{i}]: ({u}, {v})"
+                                 for i, (u, v) in enumerate(zip(it, it))],
+                to_idx=None if SUMMARY_MODE else sidx)  # summary: JSON gets one range line
+    if SUMMARY_MODE:
+        array_summary(sidx, uvs, 2, 2, "UV range")
+    if len(uvs) < 2 * read_cnt:
+        _short_read(r, UV)
+    if read_cnt < uv_count:
+        value_line(out, depth + 1, f"[WARN] UV array truncated (read {read_cnt}/{uv_count})", to_idx=sidx)
+
+def _mesh_smooth(r, scid, slen, sub_end, depth, out, sidx, chunks, anomalies):
+    handle_object_smooth_flat(r, slen, depth + 1, out, chunks, anomalies, sidx)
+
+def _mesh_xform(r, scid, slen, sub_end, depth, out, sidx, *_):
+    mat = XFORM_12F.unpack(r.read(48))
+    mat_fmt = ", ".join(fmtf(v) for v in mat)
+    value_line(out, depth + 1, f"Xform: ({mat_fmt})", to_idx=sidx)
+
+def _mesh_visible(r, scid, slen, sub_end, depth, out, sidx, *_):
+    vis = U8.unpack(r.read(1))[0]
+    value_line(out, depth + 1, f"Visible: {'yes' if vis else 'no'}", to_idx=sidx)
+
+def _mesh_face_map_channel(r, scid, slen, sub_end, depth, out, sidx, chunks, anomalies):
+    if r.pos + 6 > sub_end:
+        value_line(out, depth + 1, "FACE_MAP_CHANNEL: [truncated header]", to_idx=sidx)
+        return
+    channel_i, uv_count = FMC_HDR.unpack(r.read(6))
+    value_line(out, depth + 1, f"UV Channel: {channel_i}  count={uv_count}", to_idx=sidx)
+    uv_bytes = uv_count * 8
+    if r.pos + uv_bytes > sub_end:
+        need = uv_bytes; have = max(0, sub_end - r.pos)
+        value_line(out, depth + 1, f"[WARN] 0x4200 UV list truncated (need {need}, have {have})", to_idx=sidx)
+        return
+    uvs = read_records(r, "f", 2, uv_count)
+    it = map(fmtf, uvs)
+    value_lines(out, depth + 1, [f"UV[{i}]: ({u}, {v})"
+                                 for i, (u, v) in enumerate(zip(it, it))],
+                to_idx=None if SUMMARY_MODE else sidx)  # summary: JSON gets one range line
+    if SUMMARY_MODE:
+        array_summary(sidx, uvs, 2, 2, "UV range")
+    if len(uvs) < 2 * uv_count:
+        _short_read(r, UV)
+    if r.pos + 2 > sub_end:
+        value_line(out, depth + 1, "[WARN] 0x4200 missing face-count", to_idx=sidx)
+        return
+    fcnt = U16.unpack(r.read(2))[0]
+    faces_bytes = fcnt * 6
+    if r.pos + faces_bytes > sub_end:
+        got = max(0, sub_end - r.pos)
+        value_line(out, depth + 1, f"[WARN] 0x4200 UV face list truncated (need {faces_bytes}, have {got})", to_idx=sidx)
+        return
+    tris = read_records(r, "H", 3, fcnt)
+    it = iter(tris)
+    value_lines(out, depth + 1, [f"UVFace[{i}]: ({a}, {b}, {c})"
+                                 for i, (a, b, c) in enumerate(zip(it, it, it))],
+                to_idx=None if SUMMARY_MODE else sidx)  # summary: JSON gets one range line
+    if SUMMARY_MODE:
+        array_summary(sidx, tris, 3, 3, "UVFace index range", str)
+    if len(tris) < 3 * fcnt:
+        _short_read(r, UV_FACE)
+    if r.pos < sub_end:
+        rem = sub_end - r.pos
+        if rem > 0:
+            tail = r.read(min(32, rem))
+            value_line(out, depth + 1, f"[info] 0x4200 trailing bytes: {rem} (first 32 shown)", to_idx=sidx)
+            dump_hex_preview(out, depth + 2, tail)
+
+MESH_LEAVES = {
+    0x4110: (8, _mesh_vertices),
+    0x4120: (8, _mesh_faces),
+    0x4130: (0, _mesh_material),
+    0x4140: (8, _mesh_uvs),
+    0x4150: (0, _mesh_smooth),
+    0x4160: (6 + 48, _mesh_xform),
+    0x4165: (7, _mesh_visible),
+    0x4200: (12, _mesh_face_map_channel),
+}
 
-    f.seek(end)
+def handle_object_mesh(r, ln, depth, out, chunks, anomalies, parent_idx):
+    walk_subchunks(r, ln, depth, out, chunks, anomalies, parent_idx, MESH_LEAVES, _other_two_down)
 
 # -------- Keyframer node helpers --------
-def _read_track_header(f, limit_end):
-    start = f.tell()
+KEY_OPTS = ((0x01, "tension"), (0x02, "continuity"), (0x04, "bias"),
+            (0x08, "ease_to"), (0x10, "ease_from"))  # optional f32 per flag bit, in file order
+
+def _read_track_header(r, limit_end):
+    start = r.pos
     if start + 14 > limit_end:
         return None
-    flags = struct.unpack("<H", f.read(2))[0]
-    u1 = struct.unpack("<I", f.read(4))[0]
-    u2 = struct.unpack("<I", f.read(4))[0]
-    keys = struct.unpack("<I", f.read(4))[0]
+    if start + 14 > r.size:  # cut off by EOF: fail like the field-by-field reads
+        U16.unpack(r.read(2)); U32.unpack(r.read(4)); U32.unpack(r.read(4)); U32.unpack(r.read(4))
+    flags, u1, u2, keys = TRACK_HDR.unpack_from(r.mv, start)
+    r.pos = start + 14
     return {"flags": flags, "u1": u1, "u2": u2, "keys": keys}
 
-def _read_key_header(f, limit_end):
-    if f.tell() + 6 > limit_end:
+def _read_key_header(r, limit_end):
+    pos = r.pos
+    if pos + 6 > limit_end:
         return None
-    frame = struct.unpack("<I", f.read(4))[0]
-    kflags = struct.unpack("<H", f.read(2))[0]
+    if pos + 6 > r.size:
+        U32.unpack(r.read(4)); U16.unpack(r.read(2))
+    frame, kflags = KEY_HDR.unpack_from(r.mv, pos)
+    pos += 6
     info = {"flags": kflags}
-    def _opt(bit): return (kflags & bit) != 0
-    if _opt(0x01) and f.tell() + 4 <= limit_end:
-        info["tension"] = struct.unpack("<f", f.read(4))[0]
-    if _opt(0x02) and f.tell() + 4 <= limit_end:
-        info["continuity"] = struct.unpack("<f", f.read(4))[0]
-    if _opt(0x04) and f.tell() + 4 <= limit_end:
-        info["bias"] = struct.unpack("<f", f.read(4))[0]
-    if _opt(0x08) and f.tell() + 4 <= limit_end:
-        info["ease_to"] = struct.unpack("<f", f.read(4))[0]
-    if _opt(0x10) and f.tell() + 4 <= limit_end:
-        info["ease_from"] = struct.unpack("<f", f.read(4))[0]
+    if kflags & 0x1F:
+        for bit, key in KEY_OPTS:
+            if kflags & bit and pos + 4 <= limit_end:
+                if pos + 4 > r.size:
+                    r.pos = pos
+                    _short_read(r, F32)
+                info[key] = F32.unpack_from(r.mv, pos)[0]
+                pos += 4
+    r.pos = pos
     return frame, info
 
-def handle_kf_node(f, ln, depth, out, chunks, anomalies, parent_idx):
-    start = f.tell() - 6; end = start + ln
-    while f.tell() < end:
-        at = f.tell()
-        sub = read_chunk(f)
-        if not sub: break
-        scid, slen = sub
-        sidx = register_chunk(chunks, scid, slen, at, depth, parent_idx)
-        sub_end = at + slen
-        _CURRENT_CHUNK_IDX_STACK.append(sidx)
-        try:
-            dump_line(out, depth, f"{cid_name(scid)} (ID: 0x{scid:04X}, Length: {slen}) at Pos: {at}")
-            if scid == 0xB030 and slen >= 8:
-                node_id = struct.unpack("<H", f.read(2))[0]
-                value_line(out, depth + 1, f"NODE_ID: {node_id}", to_idx=sidx)
-            elif scid == 0xB010:
-                _handle_node_hdr(f, slen, depth + 1, out, to_idx=sidx)
-            elif scid == 0xB011:
-                name = read_cstr(f)
-                value_line(out, depth + 1, f"INSTANCE_NAME: {name}", to_idx=sidx)
-            elif scid == 0xB013 and slen >= 6 + 12:
-                px, py, pz = struct.unpack("<fff", f.read(12))
-                value_line(out, depth + 1, f"PIVOT: {fmt3(px,py,pz)}", to_idx=sidx)
-            elif scid == 0xB014 and slen >= 6 + 24:
-                minx, miny, minz, maxx, maxy, maxz = struct.unpack("<ffffff", f.read(24))
-                value_line(out, depth + 1, f"BOUNDBOX: min={fmt3(minx,miny,minz)} max={fmt3(maxx,maxy,maxz)}", to_idx=sidx)
-            elif scid == 0xB020:
-                _handle_pos_track(f, slen, depth + 1, out, to_idx=sidx)
-            elif scid == 0xB021:
-                _handle_rot_track(f, slen, depth + 1, out, to_idx=sidx)
-            elif scid == 0xB022:
-                _handle_scl_track(f, slen, depth + 1, out, to_idx=sidx)
-            else:
-                if scid in CID_REG and (is_container_chunk(scid) or is_auto_chunk(scid) and maybe_nested(f, sub_end, scid)):
-                    process_region(f, f.tell(), sub_end, depth + 2, out, chunks, anomalies, sidx)
-                else:
-                    f.seek(sub_end)
-        finally:
-            _CURRENT_CHUNK_IDX_STACK.pop()
-            f.seek(sub_end)
-    f.seek(end)
-
-def _handle_node_hdr(f, ln, depth, out, *, to_idx):
-    start = f.tell() - 6
+def _iter_track_keys(r, end, count, val, plain):
+    """
+    Yield (frame, info, values) for up to count keys of a track, each a key
+    header followed by one val record, unpacked in place from the mapped file.
+    Stops at the first key that does not fit before end. Keys without the
+    optional TCB/ease floats (the usual case) are unpacked whole with plain,
+    the header + val layout; others go through _read_key_header.
+    """
+    mv, size, width = r.mv, r.size, val.size
+    limit = min(end, size) - plain.size  # last offset a whole plain key fits at
+    for _ in range(count):
+        pos = r.pos
+        if pos <= limit:
+            rec = plain.unpack_from(mv, pos)
+            if not rec[1] & 0x1F:
+                r.pos = pos + plain.size
+                yield rec[0], {"flags": rec[1]}, rec[2:]
+                continue
+        kh = _read_key_header(r, end)
+        if not kh:
+            return
+        pos = r.pos
+        if pos + width > end:
+            return
+        if pos + width > size:
+            _short_read(r, val)
+        r.pos = pos + width
+        yield kh[0], kh[1], val.unpack_from(mv, pos)
+
+def _kf_node_id(r, scid, slen, sub_end, depth, out, sidx, *_):
+    node_id = U16.unpack(r.read(2))[0]
+    value_line(out, depth + 1, f"NODE_ID: {node_id}", to_idx=sidx)
+
+def _kf_node_hdr(r, scid, slen, sub_end, depth, out, sidx, *_):
+    _handle_node_hdr(r, slen, depth + 1, out, to_idx=sidx)
+
+def _kf_instance_name(r, scid, slen, sub_end, depth, out, sidx, *_):
+    name = read_cstr(r)
+    value_line(out, depth + 1, f"INSTANCE_NAME: {name}", to_idx=sidx)
+
+def _kf_pivot(r, scid, slen, sub_end, depth, out, sidx, *_):
+    px, py, pz = VEC3.unpack(r.read(12))
+    value_line(out, depth + 1, f"PIVOT: {fmt3(px,py,pz)}", to_idx=sidx)
+
+def _kf_boundbox(r, scid, slen, sub_end, depth, out, sidx, *_):
+    minx, miny, minz, maxx, maxy, maxz = BBOX.unpack(r.read(24))
+    value_line(out, depth + 1, f"BOUNDBOX: min={fmt3(minx,miny,minz)} max={fmt3(maxx,maxy,maxz)}", to_idx=sidx)
+
+def _kf_pos_track(r, scid, slen, sub_end, depth, out, sidx, *_):
+    _handle_pos_track(r, slen, depth + 1, out, to_idx=sidx)
+
+def _kf_rot_track(r, scid, slen, sub_end, depth, out, sidx, *_):
+    _handle_rot_track(r, slen, depth + 1, out, to_idx=sidx)
+
+def _kf_scl_track(r, scid, slen, sub_end, depth, out, sidx, *_):
+    _handle_scl_track(r, slen, depth + 1, out, to_idx=sidx)
+
+KF_NODE_LEAVES = {
+    0xB030: (8, _kf_node_id),
+    0xB010: (0, _kf_node_hdr),
+    0xB011: (0, _kf_instance_name),
+    0xB013: (6 + 12, _kf_pivot),
+    0xB014: (6 + 24, _kf_boundbox),
+    0xB020: (0, _kf_pos_track),
+    0xB021: (0, _kf_rot_track),
+    0xB022: (0, _kf_scl_track),
+}
+
+def handle_kf_node(r, ln, depth, out, chunks, anomalies, parent_idx):
+    walk_subchunks(r, ln, depth, out, chunks, anomalies, parent_idx, KF_NODE_LEAVES, _other_two_down)
+
+def _handle_node_hdr(r, ln, depth, out, *, to_idx):
+    start = r.pos - 6
     end = start + ln
-    name = read_cstr(f)
-    flag1 = struct.unpack("<H", f.read(2))[0] if f.tell() + 2 <= end else 0
-    flag2 = struct.unpack("<H", f.read(2))[0] if f.tell() + 2 <= end else 0
-    parent_id = struct.unpack("<H", f.read(2))[0] if f.tell() + 2 <= end else 0xFFFF
+    name = read_cstr(r)
+    pos = r.pos
+    if pos + 6 <= end and pos + 6 <= r.size:
+        flag1, flag2, parent_id = NODE_TAIL.unpack_from(r.mv, pos)
+        r.pos = pos + 6
+    else:  # truncated tail: take whichever fields fit, fail at EOF as before
+        flag1 = U16.unpack(r.read(2))[0] if r.pos + 2 <= end else 0
+        flag2 = U16.unpack(r.read(2))[0] if r.pos + 2 <= end else 0
+        parent_id = U16.unpack(r.read(2))[0] if r.pos + 2 <= end else 0xFFFF
     value_line(out, depth, f"NODE_HDR: name='{name}', Flag1=0x{flag1:04X}, Flag2=0x{flag2:04X}, Parent={parent_id}", to_idx=to_idx)
-    f.seek(end)
 
-def _handle_pos_track(f, ln, depth, out, *, to_idx):
-    start = f.tell() - 6; end = start + ln
-    hdr = _read_track_header(f, end)
+def _handle_pos_track(r, ln, depth, out, *, to_idx):
+    start = r.pos - 6; end = start + ln
+    hdr = _read_track_header(r, end)
     if not hdr:
-        f.seek(end); return
+        r.pos = end; return
     value_line(out, depth, f"POS_TRACK_TAG: keys={hdr['keys']} flags=0x{hdr['flags']:04X}", to_idx=to_idx)
-    for _ in range(hdr["keys"]):
-        kh = _read_key_header(f, end)
-        if not kh: break
-        frame, info = kh
-        if f.tell() + 12 > end: break
-        x, y, z = struct.unpack("<fff", f.read(12))
+    for frame, info, (x, y, z) in _iter_track_keys(r, end, hdr["keys"], VEC3, KEY_VEC3):
         value_line(out, depth, f"\t@{frame}: pos={fmt3(x,y,z)} {info}", to_idx=to_idx)
-    f.seek(end)
 
-def _handle_rot_track(f, ln, depth, out, *, to_idx):
-    start = f.tell() - 6; end = start + ln
-    hdr = _read_track_header(f, end)
+def _handle_rot_track(r, ln, depth, out, *, to_idx):
+    start = r.pos - 6; end = start + ln
+    hdr = _read_track_header(r, end)
     if not hdr:
-        f.seek(end); return
+        r.pos = end; return
     value_line(out, depth, f"ROT_TRACK_TAG: keys={hdr['keys']} flags=0x{hdr['flags']:04X}", to_idx=to_idx)
-    for _ in range(hdr["keys"]):
-        kh = _read_key_header(f, end)
-        if not kh: break
-        frame, info = kh
-        if f.tell() + 16 > end: break
-        ang, ax, ay, az = struct.unpack("<ffff", f.read(16))
+    for frame, info, (ang, ax, ay, az) in _iter_track_keys(r, end, hdr["keys"], ROT_KEY, KEY_ROT):
         value_line(out, depth, f"\t@{frame}: rot=angle({fmtf(ang)}) axis={fmt3(ax,ay,az)} {info}", to_idx=to_idx)
-    f.seek(end)
 
-def _handle_scl_track(f, ln, depth, out, *, to_idx):
-    start = f.tell() - 6; end = start + ln
-    hdr = _read_track_header(f, end)
+def _handle_scl_track(r, ln, depth, out, *, to_idx):
+    start = r.pos - 6; end = start + ln
+    hdr = _read_track_header(r, end)
     if not hdr:
-        f.seek(end); return
+        r.pos = end; return
     value_line(out, depth, f"SCL_TRACK_TAG: keys={hdr['keys']} flags=0x{hdr['flags']:04X}", to_idx=to_idx)
-    for _ in range(hdr["keys"]):
-        kh = _read_key_header(f, end)
-        if not kh: break
-        frame, info = kh
-        if f.tell() + 12 > end: break
-        sx, sy, sz = struct.unpack("<fff", f.read(12))
+    for frame, info, (sx, sy, sz) in _iter_track_keys(r, end, hdr["keys"], VEC3, KEY_VEC3):
         value_line(out, depth, f"\t@{frame}: scale={fmt3(sx,sy,sz)} {info}", to_idx=to_idx)
-    f.seek(end)
 
 # -----------------------------
 # Viewport / Display handler (JSON-aware)
@@ -838,14 +1030,14 @@ def handle_vendor_payload(ch, cid: int, ctx):
         for pth in sorted(set(paths)):
             ctx.write_line(f"\t\t  - {pth}")
     ch.Descend()
-def handle_viewport_block(f, ln, depth, out, chunks, anomalies, parent_idx):
-    start = f.tell() - 6
+def handle_viewport_block(r, ln, depth, out, chunks, anomalies, parent_idx):
+    start = r.pos - 6
     end = start + ln
 
     # Read the view type (u16) if present
     view_type = None
-    if end - f.tell() >= 2:
-        (view_type,) = struct.unpack("<H", f.read(2))
+    if end - r.pos >= 2:
+        (view_type,) = U16.unpack(r.read(2))
         view_name = VIEW_ENUM.get(view_type, f"#{view_type}")
         dump_line(out, depth, f"Viewport view: {view_name}")
     else:
@@ -853,10 +1045,10 @@ def handle_viewport_block(f, ln, depth, out, chunks, anomalies, parent_idx):
         dump_line(out, depth, "Viewport: [too short to read view type]")
 
     # Read tail and show a short hex preview in the text dump
-    tail_len = max(0, end - f.tell())
+    tail_len = max(0, end - r.pos)
     tail_bytes = b""
     if tail_len:
-        tail_bytes = f.read(tail_len)
+        tail_bytes = r.read(tail_len)
         dump_hex_preview(out, depth, tail_bytes, max_bytes=64)
 
     # Parse known fields from the tail
@@ -900,8 +1092,6 @@ def handle_viewport_block(f, ln, depth, out, chunks, anomalies, parent_idx):
         "ref_name": parsed["ref_name"],
     })
 
-    f.seek(end)
-
 # -----------------------------
 # SPECIAL dispatch
 # -----------------------------
@@ -910,16 +1100,16 @@ SPECIAL = {
     0xAFFF: handle_material,
     0x4100: handle_object_mesh,
 
-    0x0002: lambda f, ln, d, out, *_: decode_m3d_version(f, ln, d, out, to_idx=_current_chunk_idx()),
-    0x3D3E: lambda f, ln, d, out, *_: decode_mesh_version(f, ln, d, out, to_idx=_current_chunk_idx()),
+    0x0002: decode_m3d_version,
+    0x3D3E: decode_mesh_version,
 
-    0x4130: lambda f, ln, d, out, *_args, **_kw: handle_object_material_flat(f, ln, d, out, to_idx=_current_chunk_idx()),
-    0x4150: lambda f, ln, d, out, *_args, **_kw: handle_object_smooth_flat(f, ln, d, out, to_idx=_current_chunk_idx()),
+    0x4130: handle_object_material_flat,
+    0x4150: handle_object_smooth_flat,
 
     # Keyframer flat headers → parsed & included in JSON when values exist
-    0xB00A: lambda f, ln, d, out, *_: decode_kfhdr(f, ln, d, out, to_idx=_current_chunk_idx()),
-    0xB008: lambda f, ln, d, out, *_: decode_kfcurtime_range(f, ln, d, out, to_idx=_current_chunk_idx()),
-    0xB009: lambda f, ln, d, out, *_: decode_kfcurtime(f, ln, d, out, to_idx=_current_chunk_idx()),
+    0xB00A: decode_kfhdr,
+    0xB008: decode_kfcurtime_range,
+    0xB009: decode_kfcurtime,
 
     # KF node trees
     0xB002: handle_kf_node,
@@ -939,104 +1129,132 @@ SPECIAL = {
     0x7020: handle_viewport_block,
 }
 
+# Flat IDs without a handler: nothing to do past the header line
+_PLAIN_FLAT = _FLAT - SPECIAL.keys()
+
 # -----------------------------
 # Core walker
 # -----------------------------
-def process_region(f, region_start, region_end, depth, out, chunks, anomalies, parent_idx):
-    f.seek(region_start)
-    file_len = f.seek(0, os.SEEK_END)
-    f.seek(region_start)
-    while f.tell() < region_end:
-        at = f.tell()
-        ch = read_chunk(f)
-        if not ch:
-            anomalies.append({"type": "truncated_header", "offset": at})
-            break
-        cid, length = ch
-        if length < 6:
-            anomalies.append({"type": "invalid_size", "cid": cid, "offset": at, "size": length})
-            break
-        chunk_end = at + length
-        if chunk_end > file_len:
-            anomalies.append({"type": "exceeds_file", "cid": cid, "offset": at, "declared_end": chunk_end, "file_len": file_len})
-            chunk_end = min(chunk_end, file_len)
-
-        idx = register_chunk(chunks, cid, length, at, depth, parent_idx)
-
-        _CURRENT_CHUNK_IDX_STACK.append(idx)
-        try:
-            dump_line(out, depth, f"{cid_name(cid)} (ID: 0x{cid:04X}, Length: {length}) at Pos: {at}")
-            payload_start = f.tell()
+def process_region(r, region_start, region_end, depth, out, chunks, anomalies, parent_idx):
+    """Walk a chunk region; generic containers are descended via an explicit
+    stack of suspended regions instead of Python recursion."""
+    r.pos = region_start
+    file_len = r.size
+    stack = []  # (region_end, depth, parent_idx, resume_pos) of suspended parents
+    # Dispatch tables as locals, checked in order of frequency in typical files:
+    # plain flat leaves, then handled chunks, then containers / auto-nesting.
+    plain_flat, special_get, container, not_auto = _PLAIN_FLAT, SPECIAL.get, _CONTAINER, _NOT_AUTO
+    names = CID_NAMES
+    while True:
+        while r.pos < region_end:
+            at = r.pos
+            ch = read_chunk(r)
+            if not ch:
+                anomalies.append({"type": "truncated_header", "offset": at})
+                break
+            cid, length = ch
+            if length < 6:
+                anomalies.append({"type": "invalid_size", "cid": cid, "offset": at, "size": length})
+                break
+            chunk_end = at + length
+            if chunk_end > file_len:
+                anomalies.append({"type": "exceeds_file", "cid": cid, "offset": at, "declared_end": chunk_end, "file_len": file_len})
+                chunk_end = min(chunk_end, file_len)
+
+            idx = register_chunk(chunks, cid, length, at, depth, parent_idx)
+
+            dump_line(out, depth, f"{names[cid]} (ID: 0x{cid:04X}, Length: {length}) at Pos: {at}")
+            if cid in plain_flat:
+                r.pos = chunk_end
+                continue
+
+            handler = special_get(cid)
+            if handler is None:
+                if cid in container or (cid not in not_auto and maybe_nested(r, chunk_end, parent_cid=cid)):
+                    # Descend: children are read from the current position.
+                    stack.append((region_end, depth, parent_idx, chunk_end))
+                    region_end, depth, parent_idx = chunk_end, depth + 1, idx
+                    continue
+            else:
+                try:
+                    handler(r, length, depth + 1, out, chunks, anomalies, idx)
+                except Exception as ex:
+                    value_line(out, depth + 1, f"[ERROR] parsing 0x{cid:04X}: {ex}", to_idx=idx)
 
-            try:
-                handler = SPECIAL.get(cid)
-                if handler is None:
-                    if is_flat_chunk(cid):
-                        f.seek(chunk_end)
-                    elif is_container_chunk(cid) or is_auto_chunk(cid):
-                        if is_container_chunk(cid) or maybe_nested(f, chunk_end, parent_cid=cid):
-                            process_region(f, payload_start, chunk_end, depth + 1, out, chunks, anomalies, idx)
-                        else:
-                            f.seek(chunk_end)
-                else:
-                    handler(f, length, depth + 1, out, chunks, anomalies, idx)
-
-            except Exception as ex:
-                value_line(out, depth + 1, f"[ERROR] parsing 0x{cid:04X}: {ex}", to_idx=idx)
-                f.seek(chunk_end)
-
-        finally:
-            _CURRENT_CHUNK_IDX_STACK.pop()
-            f.seek(chunk_end)
+            r.pos = chunk_end
+
+        if not stack:
+            return
+        region_end, depth, parent_idx, r.pos = stack.pop()
 
 # -----------------------------
 # JSON writer (minimal keys)
 # -----------------------------
-def _node_view_minimal(ch):
-    return {
-        "id_hex": f"0x{ch['id']:04X}",
-        "name": REF.get(ch["id"], f"UNKNOWN_{ch['id']:04X}"),
-        # 'lines' added only if present
-        # 'children' added only if non-empty
-    }
-
-def _build_nested_tree(chunks):
-    idx_to_node = {ch["index"]: _node_view_minimal(ch) for ch in chunks}
-
-    # Attach non-empty lines only
-    for idx, lines in LINES_MAP.items():
+def _write_chunk_nodes(w, chunks, roots):
+    """
+    Emit the nested chunk list exactly as json.dumps(indent=2) lays it out, one
+    node at a time, without building the tree: an explicit stack holds the
+    sibling iterator of every open "children" list. Node keys: id_hex, name,
+    then 'lines' only if present and 'children' only if non-empty.
+    """
+    if not roots:
+        w("[]")
+        return
+    ptr, kids = chunks.children()
+    ids, names = chunks.ids, CID_NAMES
+    dumps = json.encoder.encode_basestring_ascii  # what json.dumps(str) ends up calling, minus the dispatch
+    w("[")
+    stack = [[iter(roots), 1, True]]  # [siblings, list level, first item pending]
+    while stack:
+        frame = stack[-1]
+        idx = next(frame[0], None)
+        level = frame[1]
+        if idx is None:
+            stack.pop()
+            w("\n" + "  " * level + "]")
+            if stack:  # close the node that owns this children list
+                w("\n" + "  " * (level - 1) + "}")
+            continue
+        item = "  " * (level + 1)
+        body = item + "  "
+        cid = ids[idx]
+        name = dumps(names[cid])
+        w(("\n" if frame[2] else ",\n") + f'{item}{{\n{body}"id_hex": "0x{cid:04X}",\n{body}"name": {name}')
+        frame[2] = False
+        lines = CHUNK_LINES[idx]
         if lines:
-            idx_to_node[idx]["lines"] = list(lines)
-
-    # Attach children only when non-empty
-    for ch in chunks:
-        if ch["children"]:
-            idx_to_node[ch["index"]]["children"] = [idx_to_node[cidx] for cidx in ch["children"]]
-
-    roots = [idx_to_node[ch["index"]] for ch in chunks if ch["parent"] is None]
-    return roots
+            inner = ",\n" + body + "  "
+            w(f',\n{body}"lines": [\n{body}  ' + inner.join(map(dumps, lines)) + f"\n{body}]")
+        lo, hi = ptr[idx], ptr[idx + 1]
+        if hi > lo:
+            w(f',\n{body}"children": [')
+            stack.append([iter(kids[lo:hi]), level + 2, True])
+        else:
+            w("\n" + item + "}")
 
 def write_json(outdir, src_path, chunks, anomalies):
     p = outdir / "report.json"
-    tree = _build_nested_tree(chunks)
-    payload = {
-        "file": os.path.basename(src_path),
-        "size": int(Path(src_path).stat().st_size),
-        "chunks": tree,
-    }
-    if anomalies:
-        payload["anomalies"] = anomalies
-    p.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    roots = [idx for idx, parent in enumerate(chunks.parents) if parent < 0]
+    with p.open("w", encoding="utf-8") as f:
+        w = f.write
+        w("{\n")
+        w(f'  "file": {json.dumps(os.path.basename(src_path))},\n')
+        w(f'  "size": {int(Path(src_path).stat().st_size)},\n')
+        w('  "chunks": ')
+        _write_chunk_nodes(w, chunks, roots)
+        if anomalies:
+            w(',\n  "anomalies": ' + json.dumps(anomalies, indent=2).replace("\n", "\n  "))
+        w("\n}")
 
 # -----------------------------
 # Markdown reports
 # -----------------------------
-def write_summary(outdir, chunks, unknown_ids, anomalies):
+def write_summary(outdir, chunks, unknown_ids, anomalies, id_counts):
     p = outdir / "summary.md"
     lines = [
         "# I3D File Analysis — Summary", "",
         f"- Total chunks: **{len(chunks)}**",
-        f"- Unique IDs: **{len(set(ch['id'] for ch in chunks))}**",
+        f"- Unique IDs: **{len(id_counts)}**",
         f"- Unknown IDs encountered: **{len(unknown_ids)}**",
         f"- Anomalies: **{len(anomalies)}**" if anomalies else "- Anomalies: **0**",
         "",
@@ -1047,42 +1265,39 @@ def write_summary(outdir, chunks, unknown_ids, anomalies):
 def write_chunk_tree(outdir, chunks):
     p = outdir / "chunk_tree.md"
     lines = ["# Chunk Tree", ""]
-    for ch in chunks:
-        nm = REF.get(ch["id"], f"UNKNOWN_{ch['id']:04X}")
-        lines.append(f"{'  '*ch['depth']}- `0x{ch['id']:04X}` **{nm}** (off={ch['offset']}, size={ch['size']})")
+    names = CID_NAMES
+    indents = ["  " * d for d in range(max(chunks.depths, default=0) + 1)]
+    lines.extend(f"{indents[depth]}- `0x{cid:04X}` **{names[cid]}** (off={off}, size={size})"
+                 for cid, depth, off, size in zip(chunks.ids, chunks.depths, chunks.offsets, chunks.sizes))
     p.write_text("\n".join(lines), encoding="utf-8")
 
 def write_chunks_by_cid(outdir, chunks):
     p = outdir / "chunks_by_cid.md"
     groups = defaultdict(list)
-    for ch in chunks:
-        groups[ch["id"]].append(ch)
+    for idx, cid in enumerate(chunks.ids):
+        groups[cid].append(idx)
+    offsets, sizes, depths = chunks.offsets, chunks.sizes, chunks.depths
     lines = ["# Chunks Grouped by CID", ""]
     for cid in sorted(groups.keys()):
         lines.append(f"## `0x{cid:04X}` — {REF.get(cid, 'UNKNOWN')}")
-        for ch in groups[cid]:
-            lines.append(f"- idx={ch['index']}, off={ch['offset']}, size={ch['size']}, depth={ch['depth']}")
+        lines.extend(f"- idx={idx}, off={offsets[idx]}, size={sizes[idx]}, depth={depths[idx]}"
+                     for idx in groups[cid])
         lines.append("")
     p.write_text("\n".join(lines), encoding="utf-8")
 
-def write_unknown_ids(outdir, chunks):
+def write_unknown_ids(outdir, id_counts, unknown):
     p = outdir / "unknown_ids.md"
-    seen = {}
-    for ch in chunks:
-        if ch["id"] not in CID_REG:
-            seen.setdefault(ch["id"], []).append(ch)
     lines = ["# Unknown Chunk IDs", ""]
-    if not seen:
+    if not unknown:
         lines.append("- None")
     else:
-        for cid in sorted(seen.keys()):
-            lines.append(f"- `0x{cid:04X}` ({len(seen[cid])} occurrence(s))")
+        for cid in unknown:
+            lines.append(f"- `0x{cid:04X}` ({id_counts[cid]} occurrence(s))")
     p.write_text("\n".join(lines), encoding="utf-8")
 
-def write_unused_known_ids(outdir, chunks):
+def write_unused_known_ids(outdir, id_counts):
     p = outdir / "unused_known_ids.md"
-    used = set(ch["id"] for ch in chunks)
-    unused = [(cid, meta["name"]) for cid, meta in CID_REG.items() if cid not in used]
+    unused = [(cid, CID_REG[cid]["name"]) for cid in CID_REG.keys() - id_counts.keys()]
     lines = [
         "# Unused Known Chunk IDs", "",
         "| ID (hex) | ID (dec) | Name |",
@@ -1129,10 +1344,15 @@ def write_viewports(outdir):
 # Entry
 # -----------------------------
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python i3d_analyzer.py file.i3d")
+    global SUMMARY_MODE
+    args = sys.argv[1:]
+    if "--summary" in args:
+        SUMMARY_MODE = True
+        args = [a for a in args if a != "--summary"]
+    if not args:
+        print("Usage: python i3d_analyzer.py [--summary] file.i3d")
         sys.exit(2)
-    src = Path(sys.argv[1])
+    src = Path(args[0])
     if not src.exists() or not src.is_file():
         print(f"File not found: {src}")
         sys.exit(3)
@@ -1144,25 +1364,27 @@ def main():
     outdir.mkdir(parents=True, exist_ok=True)
     dump_path = outdir / f"{full_base_name}.dump.txt"
 
-    chunks = []
+    chunks = ChunkTable()
+    CHUNK_LINES.clear()  # indexed in step with chunks
     anomalies = []
 
-    with src.open("rb") as f, dump_path.open("w", encoding="utf-8") as out:
+    # 1 MiB write buffer: the dump is many short lines, flushed in large blocks
+    with src.open("rb") as f, dump_path.open("w", encoding="utf-8", buffering=1 << 20) as out:
         size = src.stat().st_size
         out.write(f"Analyzing: {src} (size={size})\n")
-        process_region(f, 0, size, 0, out, chunks, anomalies, None)
+        process_region(open_reader(f), 0, size, 0, out, chunks, anomalies, None)
 
     # JSON output
     write_json(outdir, str(src), chunks, anomalies)
 
     # Markdown reports (same set as requested)
-    seen = set(ch["id"] for ch in chunks)
-    unknown = sorted(seen - set(CID_REG.keys()))
-    write_summary(outdir, chunks, unknown, anomalies)
+    id_counts = Counter(chunks.ids)  # one pass over the IDs feeds every ID-based report
+    unknown = sorted(id_counts.keys() - CID_REG.keys())
+    write_summary(outdir, chunks, unknown, anomalies, id_counts)
     write_chunk_tree(outdir, chunks)
     write_chunks_by_cid(outdir, chunks)
-    write_unknown_ids(outdir, chunks)
-    write_unused_known_ids(outdir, chunks)
+    write_unknown_ids(outdir, id_counts, unknown)
+    write_unused_known_ids(outdir, id_counts)
     write_anomalies(outdir, anomalies)
     write_viewports(outdir)  # optional, handy for debugging
 
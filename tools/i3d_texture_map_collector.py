@@ -48,32 +48,29 @@ MAT_TEXMAP          = 0xA200
 MAT_MAP_FILEPATH    = 0xA300
 
 # ---- Binary helpers
-def read_chunk(f):
-    hdr = f.read(6)
-    if len(hdr) < 6:
+CHUNK_HDR           = struct.Struct("<HI")   # chunk id, total size incl. header
+
+# The file is read into memory once; helpers take (buf, pos) instead of a
+# file handle, so walking the chunk tree costs no reads or seeks.
+def read_chunk(buf: bytes, pos: int):
+    if pos + 6 > len(buf):
         return None
-    return struct.unpack("<HI", hdr)
-
-def read_cstr(f) -> str:
-    bs = bytearray()
-    while True:
-        b = f.read(1)
-        if not b or b == b"\x00":
-            break
-        bs += b
+    return CHUNK_HDR.unpack_from(buf, pos)
+
+def read_cstr(buf: bytes, pos: int) -> str:
+    end = buf.find(b"\x00", pos)
+    bs = buf[pos:end] if end >= 0 else buf[pos:]
     try:
         return bs.decode("ascii", errors="replace")
     except Exception:
         return bs.decode("latin1", errors="replace")
 
-def maybe_nested(f, region_end) -> bool:
-    pos = f.tell()
+def maybe_nested(buf: bytes, pos: int, region_end: int) -> bool:
     if region_end - pos < 6:
         return False
-    peek = f.read(6); f.seek(pos)
-    if len(peek) < 6:
+    if pos + 6 > len(buf):
         return False
-    cid, ln = struct.unpack("<HI", peek)
+    cid, ln = CHUNK_HDR.unpack_from(buf, pos)
     return ln >= 6 and pos + ln <= region_end
 
 # ---- Extract texture basenames (ANY extension)
@@ -81,50 +78,47 @@ def collect_texture_basenames(i3d_path: Path) -> List[str]:
     basenames: List[str] = []
     seen_lower: Set[str] = set()
 
-    size = i3d_path.stat().st_size
-    with i3d_path.open("rb") as f:
-        def walk_region(region_end):
-            while f.tell() < region_end:
-                at = f.tell()
-                ch = read_chunk(f)
-                if not ch:
-                    break
-                cid, length = ch
-                if length < 6:
-                    f.seek(region_end)
-                    return
-                chunk_end = at + length
-
-                if cid == MATERIAL:
-                    walk_region(chunk_end)
-
-                elif cid == MAT_TEXMAP:
-                    while f.tell() < chunk_end:
-                        sat = f.tell()
-                        sub = read_chunk(f)
-                        if not sub:
-                            break
-                        scid, slen = sub
-                        sub_end = sat + slen
-                        if scid == MAT_MAP_FILEPATH:
-                            tex_path = read_cstr(f).strip()
-                            base = os.path.basename(tex_path)
-                            if base:
-                                key = base.lower()
-                                if key not in seen_lower:
-                                    seen_lower.add(key)
-                                    basenames.append(base)  # preserve original case from I3D
-                        f.seek(sub_end)
-
-                else:
-                    if maybe_nested(f, chunk_end):
-                        walk_region(chunk_end)
-                    else:
-                        f.seek(chunk_end)
+    buf = i3d_path.read_bytes()
 
-                f.seek(chunk_end)
-
-        walk_region(size)
+    def walk_region(pos, region_end):
+        while pos < region_end:
+            at = pos
+            ch = read_chunk(buf, pos)
+            if not ch:
+                break
+            cid, length = ch
+            if length < 6:
+                return
+            chunk_end = at + length
+            pos = at + 6
+
+            if cid == MATERIAL:
+                walk_region(pos, chunk_end)
+
+            elif cid == MAT_TEXMAP:
+                while pos < chunk_end:
+                    sat = pos
+                    sub = read_chunk(buf, pos)
+                    if not sub:
+                        break
+                    scid, slen = sub
+                    sub_end = sat + slen
+                    if scid == MAT_MAP_FILEPATH:
+                        tex_path = read_cstr(buf, sat + 6).strip()
+                        base = os.path.basename(tex_path)
+                        if base:
+                            key = base.lower()
+                            if key not in seen_lower:
+                                seen_lower.add(key)
+                                basenames.append(base)  # preserve original case from I3D
+                    pos = sub_end
+
+            elif maybe_nested(buf, pos, chunk_end):
+                walk_region(pos, chunk_end)
+
+            pos = chunk_end
+
+    walk_region(0, len(buf))
 
     return basenames
 
@@ -11,15 +11,19 @@ i3d_to_3ds.py — I3D → 3DS with FMC UV split + Materials/Textures for 3ds Max
 
 Usage:
     python i3d_to_3ds.py input.i3d -o output.3ds [--channel 1] [--bake-xform]
+    python i3d_to_3ds.py models/ "more/*.i3d" -o out_dir/ [--jobs 8]
 
 Notes:
 - Texture paths written as-is from the I3D (often just basenames). Ensure Max
   can find them (place textures next to the .3ds or add folder to Max paths).
 """
 
+import os
 import sys
+import glob
 import struct
 import argparse
+from array import array
 from pathlib import Path
 from typing import List, Tuple, Dict, Optional
 
@@ -51,49 +55,86 @@ FACE_MAP_CHANNEL        = 0x4200  # FMC
 # Keyframer (pass-through raw)
 KFDATA                  = 0xB000
 
+# Precompiled binary layouts (little-endian)
+CHUNK_HDR               = struct.Struct("<HI")   # chunk id, total size incl. header
+U16                     = struct.Struct("<H")    # counts
+U32                     = struct.Struct("<I")    # M3D_VERSION
+I32                     = struct.Struct("<i")    # FMC channel index
+XFORM_12F               = struct.Struct("<12f")  # 0x4160 placement matrix
+
 # ---------- Helpers ----------
-def read_chunk(f):
-    hdr = f.read(6)
-    if len(hdr) < 6:
+# The parser works on the whole file held in memory: every reader takes
+# (buf, pos) and returns the position after what it consumed, mirroring
+# where the old file-handle version left f.tell().
+def read_chunk(buf: bytes, pos: int):
+    if pos + 6 > len(buf):
         return None
-    cid, ln = struct.unpack("<HI", hdr)
+    cid, ln = CHUNK_HDR.unpack_from(buf, pos)
     return cid, ln
 
-def read_cstr(f) -> str:
-    bs = bytearray()
-    while True:
-        b = f.read(1)
-        if not b or b == b"\x00":
-            break
-        bs += b
+def read_cstr(buf: bytes, pos: int) -> Tuple[str, int]:
+    end = buf.find(b"\x00", pos)
+    if end < 0:
+        bs, nxt = buf[pos:], max(pos, len(buf))
+    else:
+        bs, nxt = buf[pos:end], end + 1
     try:
-        return bs.decode("ascii", errors="replace")
+        return bs.decode("ascii", errors="replace"), nxt
     except Exception:
-        return bs.decode("latin1", errors="replace")
-
-def maybe_nested(f, region_end) -> bool:
-    pos = f.tell()
+        return bs.decode("latin1", errors="replace"), nxt
+
+def read_array(buf: bytes, pos: int, typecode: str, count: int) -> array:
+    """`count` little-endian items of `typecode` at buf[pos:] (struct.error if truncated)."""
+    arr = array(typecode)
+    end = pos + arr.itemsize * count
+    if end > len(buf):
+        raise struct.error(f"unpack requires a buffer of {end - pos} bytes")
+    arr.frombytes(memoryview(buf)[pos:end])
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+def le_bytes(arr: array) -> bytes:
+    """Raw little-endian bytes of a typed array (3DS/I3D is little-endian)."""
+    if sys.byteorder != "little":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+_INF = float("inf")
+
+def f32_array(values) -> array:
+    """float32 array of values; like struct.pack("<f"), a finite value too large
+    for float32 raises OverflowError instead of being stored as inf."""
+    arr = array("f", values)
+    if arr.count(_INF) + arr.count(-_INF) != values.count(_INF) + values.count(-_INF):
+        raise OverflowError("float too large to pack with f format")
+    return arr
+
+def maybe_nested(buf: bytes, pos: int, region_end: int) -> bool:
     if region_end - pos < 6:
         return False
-    peek = f.read(6); f.seek(pos)
-    if len(peek) < 6: return False
-    _cid, ln = struct.unpack("<HI", peek)
+    peek = read_chunk(buf, pos)
+    if not peek: return False
+    _cid, ln = peek
     return ln >= 6 and pos + ln <= region_end
 
 # ---------- Data containers ----------
 class Mesh:
+    # Geometry is kept as flat typed arrays, exactly as laid out on disk
+    # (x,y,z / a,b,c / u,v per element), so parse and emit are bulk copies.
     def __init__(self, name: str):
         self.name = name
-        self.vertices: List[Tuple[float,float,float]] = []
-        self.faces: List[Tuple[int,int,int]] = []
-        self.face_flags: List[int] = []           # optional (u16), same length as faces
-        self.smooth_masks: List[int] = []         # optional (u32), same length as faces
+        self.vertices: array = array("f")         # x, y, z per vertex
+        self.faces: array = array("H")            # a, b, c per face
+        self.face_flags: array = array("H")       # optional (u16), one per face
+        self.smooth_masks: array = array("I")     # optional (u32), one per face
         self.trans_matrix: Optional[bytes] = None # raw 12 * float
-        self.uv_primary: List[Tuple[float,float]] = []  # 0x4140 if present
-        # FMC (channel -> dict(uvs=[(u,v)], uvfaces=[(ua,ub,uc)]))
-        self.fmc_channels: Dict[int, Dict[str, list]] = {}
-        # material assignment: name -> list of face indices
-        self.mat_faces: Dict[str, List[int]] = {}
+        self.uv_primary: array = array("f")       # 0x4140 if present, u, v per vertex
+        # FMC (channel -> dict(uvs=array u,v..., uvfaces=array ua,ub,uc...))
+        self.fmc_channels: Dict[int, Dict[str, array]] = {}
+        # material assignment: name -> array('H') of face indices
+        self.mat_faces: Dict[str, array] = {}
 
 class Doc:
     def __init__(self):
@@ -104,135 +145,154 @@ class Doc:
 # ---------- I3D parse ----------
 def parse_i3d(path: Path) -> 'Doc':
     doc = Doc()
-    with path.open("rb") as f:
-        cid_ln = read_chunk(f)
-        if not cid_ln or cid_ln[0] != PRIMARY:
-            raise ValueError("Not a 3DS/I3D file (missing PRIMARY).")
-        prim_end = f.tell() - 6 + cid_ln[1]
-
-        while f.tell() < prim_end:
-            at = f.tell()
-            ch = read_chunk(f)
-            if not ch: break
-            cid, ln = ch
-            cend = at + ln
-            if cid == M3D_VERSION:
-                _ver = struct.unpack("<I", f.read(4))[0]
-            elif cid == OBJECTINFO:
-                parse_objectinfo(f, cend, doc)
-            elif cid == KFDATA:
-                # preserve raw KFDATA chunk
-                f.seek(at)
-                blob = f.read(ln)
-                doc.kfdata_blobs.append(blob)
-                f.seek(cend)
-            else:
-                f.seek(cend)
+    buf = path.read_bytes()
+    cid_ln = read_chunk(buf, 0)
+    if not cid_ln or cid_ln[0] != PRIMARY:
+        raise ValueError("Not a 3DS/I3D file (missing PRIMARY).")
+    prim_end = cid_ln[1]
+    pos = 6
+
+    while pos < prim_end:
+        at = pos
+        ch = read_chunk(buf, pos)
+        if not ch: break
+        cid, ln = ch
+        pos += 6
+        cend = at + ln
+        if cid == M3D_VERSION:
+            _ver = U32.unpack_from(buf, pos)[0]
+            pos += 4
+        elif cid == OBJECTINFO:
+            pos = parse_objectinfo(buf, pos, cend, doc)
+        elif cid == KFDATA:
+            # preserve raw KFDATA chunk
+            doc.kfdata_blobs.append(buf[at:at+ln])
+            pos = cend
+        else:
+            pos = cend
     return doc
 
-def parse_objectinfo(f, endpos: int, doc: 'Doc'):
-    while f.tell() < endpos:
-        at = f.tell()
-        ch = read_chunk(f)
+def parse_objectinfo(buf: bytes, pos: int, endpos: int, doc: 'Doc') -> int:
+    while pos < endpos:
+        at = pos
+        ch = read_chunk(buf, pos)
         if not ch: break
         cid, ln = ch
+        pos += 6
         cend = at + ln
         if cid == MATERIAL:
-            parse_material(f, cend, doc)
+            pos = parse_material(buf, pos, cend, doc)
         elif cid == OBJECT:
-            name = read_cstr(f)
+            name, pos = read_cstr(buf, pos)
             mesh = Mesh(name or "Object")
-            parse_object(f, cend, mesh)
+            pos = parse_object(buf, pos, cend, mesh)
             doc.meshes.append(mesh)
         else:
-            f.seek(cend)
+            pos = cend
+    return pos
 
-def parse_material(f, endpos: int, doc: 'Doc'):
+def parse_material(buf: bytes, pos: int, endpos: int, doc: 'Doc') -> int:
     name = None
     filepath = None
-    while f.tell() < endpos:
-        at = f.tell()
-        ch = read_chunk(f)
+    while pos < endpos:
+        at = pos
+        ch = read_chunk(buf, pos)
         if not ch: break
         cid, ln = ch
+        pos += 6
         cend = at + ln
         if cid == MAT_NAME:
-            name = read_cstr(f)
+            name, pos = read_cstr(buf, pos)
         elif cid == MAT_TEXMAP:
             # scan for MAT_MAP_FILEPATH
-            while f.tell() < cend:
-                sat = f.tell()
-                sub = read_chunk(f)
+            while pos < cend:
+                sat = pos
+                sub = read_chunk(buf, pos)
                 if not sub: break
                 scid, sln = sub
+                pos += 6
                 send = sat + sln
                 if scid == MAT_MAP_FILEPATH:
-                    filepath = read_cstr(f)
-                f.seek(send)
+                    filepath, pos = read_cstr(buf, pos)
+                pos = send
         else:
-            f.seek(cend)
+            pos = cend
     if name:
         doc.materials[name] = {"filepath": filepath}
+    return pos
 
-def parse_object(f, endpos: int, mesh: 'Mesh'):
-    while f.tell() < endpos:
-        at = f.tell()
-        ch = read_chunk(f)
+def parse_object(buf: bytes, pos: int, endpos: int, mesh: 'Mesh') -> int:
+    while pos < endpos:
+        at = pos
+        ch = read_chunk(buf, pos)
         if not ch: break
         cid, ln = ch
+        pos += 6
         cend = at + ln
         if cid == OBJECT_MESH:
-            parse_object_mesh(f, cend, mesh)
+            pos = parse_object_mesh(buf, pos, cend, mesh)
         else:
-            f.seek(cend)
+            pos = cend
+    return pos
 
-def parse_object_mesh(f, endpos: int, mesh: 'Mesh'):
-    while f.tell() < endpos:
-        at = f.tell()
-        ch = read_chunk(f)
+def parse_object_mesh(buf: bytes, pos: int, endpos: int, mesh: 'Mesh') -> int:
+    while pos < endpos:
+        at = pos
+        ch = read_chunk(buf, pos)
         if not ch: break
         cid, ln = ch
+        pos += 6
         cend = at + ln
         if cid == POINT_ARRAY:
-            n = struct.unpack("<H", f.read(2))[0]
-            mesh.vertices = [struct.unpack("<fff", f.read(12)) for _ in range(n)]
+            n = U16.unpack_from(buf, pos)[0]
+            mesh.vertices = read_array(buf, pos + 2, "f", 3*n)
+            pos += 2 + 12*n
         elif cid == OBJECT_FACES:
-            n = struct.unpack("<H", f.read(2))[0]
-            mesh.faces = []
-            mesh.face_flags = []
-            for _ in range(n):
-                a,b,c,flag = struct.unpack("<HHHH", f.read(8))
-                mesh.faces.append((a,b,c))
-                mesh.face_flags.append(flag)
+            n = U16.unpack_from(buf, pos)[0]
+            recs = read_array(buf, pos + 2, "H", 4*n)
+            pos += 2 + 8*n
+            # split (a, b, c, flags) records into index triples + flags
+            mesh.faces = array("H", bytes(6*n))
+            mesh.faces[0::3] = recs[0::4]
+            mesh.faces[1::3] = recs[1::4]
+            mesh.faces[2::3] = recs[2::4]
+            mesh.face_flags = recs[3::4]
             # scan subchunks (smoothing, material assignment)
-            while f.tell() < cend:
-                sat = f.tell()
-                sub = read_chunk(f)
+            while pos < cend:
+                sat = pos
+                sub = read_chunk(buf, pos)
                 if not sub: break
                 scid, sln = sub
+                pos += 6
                 send = sat + sln
                 if scid == OBJECT_SMOOTH:
-                    cnt = len(mesh.faces)
-                    mesh.smooth_masks = list(struct.unpack("<" + "I"*cnt, f.read(4*cnt)))
+                    cnt = len(mesh.faces) // 3
+                    mesh.smooth_masks = read_array(buf, pos, "I", cnt)
+                    pos += 4*cnt
                 elif scid == OBJECT_MATERIAL:
-                    mname = read_cstr(f)
-                    cnt = struct.unpack("<H", f.read(2))[0]
-                    idxs = list(struct.unpack("<" + "H"*cnt, f.read(2*cnt)))
-                    mesh.mat_faces.setdefault(mname, []).extend(idxs)
+                    mname, pos = read_cstr(buf, pos)
+                    cnt = U16.unpack_from(buf, pos)[0]
+                    idxs = read_array(buf, pos + 2, "H", cnt)
+                    pos += 2 + 2*cnt
+                    mesh.mat_faces.setdefault(mname, array("H")).extend(idxs)
                 else:
-                    f.seek(send)
+                    pos = send
         elif cid == OBJECT_UV:
-            n = struct.unpack("<H", f.read(2))[0]
-            mesh.uv_primary = [struct.unpack("<ff", f.read(8)) for _ in range(n)]
+            n = U16.unpack_from(buf, pos)[0]
+            mesh.uv_primary = read_array(buf, pos + 2, "f", 2*n)
+            pos += 2 + 8*n
         elif cid == OBJECT_TRANS_MATRIX:
-            mesh.trans_matrix = f.read(48)  # 12 floats
+            mesh.trans_matrix = buf[pos:pos+48]  # 12 floats
+            pos += len(mesh.trans_matrix)
         elif cid == FACE_MAP_CHANNEL:
-            parse_fmc(f, cend, mesh)
+            parse_fmc(buf, pos, cend, mesh)
+            pos = cend
         else:
-            f.seek(cend)
+            pos = cend
+    return pos
 
 
-def parse_fmc(f, endpos: int, mesh: 'Mesh'):
+def parse_fmc(buf: bytes, pos: int, endpos: int, mesh: 'Mesh'):
     """
     Expected layout per spec:
         int32  channel
@@ -242,85 +302,107 @@ def parse_fmc(f, endpos: int, mesh: 'Mesh'):
         (uint16 ua, uint16 ub, uint16 uc) * face_count
     """
     try:
-        channel = struct.unpack("<i", f.read(4))[0]   # int32
-        uv_count = struct.unpack("<H", f.read(2))[0]  # u16
-        uvs = [struct.unpack("<ff", f.read(8)) for _ in range(uv_count)]
-        face_count = struct.unpack("<H", f.read(2))[0]  # u16
-        uvfaces = [struct.unpack("<HHH", f.read(6)) for _ in range(face_count)]
+        channel = I32.unpack_from(buf, pos)[0]   # int32
+        uv_count = U16.unpack_from(buf, pos + 4)[0]  # u16
+        pos += 6
+        uvs = read_array(buf, pos, "f", 2*uv_count)
+        pos += 8*uv_count
+        face_count = U16.unpack_from(buf, pos)[0]  # u16
+        uvfaces = read_array(buf, pos + 2, "H", 3*face_count)
         mesh.fmc_channels[channel] = {"uvs": uvs, "uvfaces": uvfaces}
     except Exception:
         # ignore malformed FMC to avoid breaking the parse
         pass
-    # fast-forward any nested (defensive)
-    f.seek(endpos)
 
 
 # ---------- Math / transforms ----------
-def apply_matrix_to_vertices(vertices: List[Tuple[float,float,float]], m: bytes) -> List[Tuple[float,float,float]]:
-    vals = list(struct.unpack("<12f", m))
-    M = [vals[0:4], vals[4:8], vals[8:12]]
-    out = []
-    for x,y,z in vertices:
-        X = M[0][0]*x + M[0][1]*y + M[0][2]*z + M[0][3]
-        Y = M[1][0]*x + M[1][1]*y + M[1][2]*z + M[1][3]
-        Z = M[2][0]*x + M[2][1]*y + M[2][2]*z + M[2][3]
-        out.append((X,Y,Z))
+def apply_matrix_to_vertices(vertices: array, m: bytes) -> array:
+    vals = list(XFORM_12F.unpack(m))
+    xs, ys, zs = vertices[0::3], vertices[1::3], vertices[2::3]
+    out = array("f", bytes(4*len(vertices)))
+    for axis in range(3):
+        r0, r1, r2, r3 = vals[4*axis:4*axis+4]
+        out[axis::3] = f32_array([r0*x + r1*y + r2*z + r3 for x, y, z in zip(xs, ys, zs)])
     return out
 
 # ---------- FMC-aware rebuild ----------
-def rebuild_with_fmc(mesh: 'Mesh', channel: int):
+def rebuild_with_fmc(mesh: 'Mesh', channel: int, matrix: Optional[bytes] = None, flip_v: bool = False):
+    """Split vertices at FMC UV seams; returns (verts, uvs, faces) or None.
+
+    The optional bake matrix and V flip are applied to the source columns
+    before the gather, so each output vertex is written exactly once and
+    no further pass over the (larger) split arrays is needed.
+    """
     data = mesh.fmc_channels.get(channel)
     if not data:
-        return mesh.vertices, (mesh.uv_primary or []), mesh.faces
+        return None
 
     uvs = data["uvs"]
     uvfaces = data["uvfaces"]
     if len(uvfaces) != len(mesh.faces):
-        return mesh.vertices, (mesh.uv_primary or []), mesh.faces
-
-    key2idx: Dict[Tuple[int,int], int] = {}
-    new_vtx: List[Tuple[float,float,float]] = []
-    new_uvs: List[Tuple[float,float]] = []
-    new_faces: List[Tuple[int,int,int]] = []
-
-    def ensure_idx(pos_idx: int, uv_idx: int) -> int:
-        k = (pos_idx, uv_idx)
-        idx = key2idx.get(k)
-        if idx is not None:
-            return idx
-        vx, vy, vz = mesh.vertices[pos_idx] if 0 <= pos_idx < len(mesh.vertices) else (0.0,0.0,0.0)
-        u, v = uvs[uv_idx] if 0 <= uv_idx < len(uvs) else (0.0, 0.0)
-        idx = len(new_vtx)
-        new_vtx.append((vx,vy,vz))
-        new_uvs.append((u,v))
-        key2idx[k] = idx
-        return idx
-
-    for fi, (a,b,c) in enumerate(mesh.faces):
-        ua, ub, uc = uvfaces[fi]
-        A = ensure_idx(a, ua); B = ensure_idx(b, ub); C = ensure_idx(c, uc)
-        new_faces.append((A,B,C))
+        return None
+
+    # One int key per face corner: position index in the high bits, FMC UV
+    # index in the low 16 (both are u16 on disk, so the packing is exact).
+    keys = [(pos_idx << 16) | uv_idx for pos_idx, uv_idx in zip(mesh.faces, uvfaces)]
+    # dict.fromkeys keeps first-occurrence order, i.e. new vertices are
+    # numbered in the order faces first reference each (pos, uv) pair.
+    key2idx: Dict[int, int] = {k: i for i, k in enumerate(dict.fromkeys(keys))}
+    if len(key2idx) > 0xFFFF:
+        raise ValueError(f"Mesh '{mesh.name}': splitting at UV seams needs {len(key2idx)} vertices, "
+                         f"3DS allows at most 65535 per mesh.")
+    new_faces = list(map(key2idx.__getitem__, keys))
+
+    # Gather each output column from the source columns; an extra (0, 0, 0)
+    # / (0, 0) entry at the end catches out-of-range refs and goes through
+    # the same transform / flip as the real data.
+    nv, nu = len(mesh.vertices) // 3, len(uvs) // 2
+    pos_src = [min(k >> 16, nv) for k in key2idx]
+    uv_src = [min(k & 0xFFFF, nu) for k in key2idx]
+    src_vtx = mesh.vertices + array("f", (0.0, 0.0, 0.0))
+    if matrix:
+        src_vtx = apply_matrix_to_vertices(src_vtx, matrix)
+    new_vtx = array("f", bytes(12*len(key2idx)))
+    for axis in range(3):
+        col = src_vtx[axis::3]
+        new_vtx[axis::3] = array("f", map(col.__getitem__, pos_src))
+    new_uvs = array("f", bytes(8*len(key2idx)))
+    for axis in range(2):
+        col = uvs[axis::2]
+        col.append(0.0)
+        if flip_v and axis == 1:
+            col = array("f", [1.0 - v for v in col])
+        new_uvs[axis::2] = array("f", map(col.__getitem__, uv_src))
 
     return new_vtx, new_uvs, new_faces
 
 # ---------- Emit helpers ----------
 class ChunkBuilder:
+    # A chunk is a flat list of byte pieces: finalize() returns the header
+    # followed by the pieces, nested chunks are spliced into the parent's
+    # list with add_pieces(), and only the final write touches the data.
     def __init__(self, cid: int):
         self.cid = cid
-        self.parts: List[bytes] = []
+        self.pieces: List[bytes] = []
+        self.size = 0
     def add(self, raw: bytes):
-        self.parts.append(raw)
+        self.pieces.append(raw)
+        self.size += len(raw)
+    def add_pieces(self, pieces: List[bytes]):
+        self.pieces.extend(pieces)
+        self.size += sum(map(len, pieces))
     def add_chunk(self, cid: int, payload: bytes):
         ln = 6 + len(payload)
-        self.parts.append(struct.pack("<HI", cid, ln) + payload)
-    def finalize(self) -> bytes:
-        payload = b"".join(self.parts)
-        return struct.pack("<HI", self.cid, 6 + len(payload)) + payload
+        self.pieces.append(CHUNK_HDR.pack(cid, ln))
+        self.pieces.append(payload)
+        self.size += ln
+    def finalize(self) -> List[bytes]:
+        return [CHUNK_HDR.pack(self.cid, 6 + self.size), *self.pieces]
 
 def emit_cstr(s: str) -> bytes:
     return s.encode("ascii", errors="replace") + b"\x00"
 
-def emit_material(name: str, meta: Dict[str, Optional[str]]) -> bytes:
+def emit_material(name: str, meta: Dict[str, Optional[str]]) -> List[bytes]:
     cb = ChunkBuilder(MATERIAL)
     cb.add_chunk(MAT_NAME, emit_cstr(name))
 
@@ -334,40 +416,44 @@ def emit_material(name: str, meta: Dict[str, Optional[str]]) -> bytes:
         bb = max(0, min(255, int(b)))
         body = bytes((rr, gg, bb))
         # wrap as a chunk
-        return struct.pack("<HI", COLOR_24, 6 + len(body)) + body
+        return CHUNK_HDR.pack(COLOR_24, 6 + len(body)) + body
 
     # Use a neutral grey so material isn't pure white if texture is missing.
     # (3ds Max sometimes dislikes COLOR_F; COLOR_24 is widely supported.)
     diffuse_body = color24(180, 180, 180)
-    cb.add(struct.pack("<HI", MAT_DIFFUSE, 6 + len(diffuse_body)) + diffuse_body)
+    cb.add(CHUNK_HDR.pack(MAT_DIFFUSE, 6 + len(diffuse_body)) + diffuse_body)
 
     # Texture map (if available)
     fp = meta.get("filepath") if meta else None
     if fp:
         tm = ChunkBuilder(MAT_TEXMAP)
         tm.add_chunk(MAT_MAP_FILEPATH, emit_cstr(fp))
-        cb.add(tm.finalize())
+        cb.add_pieces(tm.finalize())
     return cb.finalize()
 
-def emit_point_array(verts: List[Tuple[float,float,float]]) -> bytes:
-    out = [struct.pack("<H", len(verts))]
-    for x,y,z in verts:
-        out.append(struct.pack("<fff", x, y, z))
-    return b"".join(out)
+def emit_point_array(verts: array) -> bytes:
+    return U16.pack(len(verts) // 3) + le_bytes(verts)
 
-def emit_object_faces(faces: List[Tuple[int,int,int]], face_flags: Optional[List[int]], smooth_masks: Optional[List[int]], mat_faces: Dict[str, List[int]]) -> bytes:
+def emit_object_faces(faces: array, face_flags: Optional[array], smooth_masks: Optional[array], mat_faces: Dict[str, array]) -> List[bytes]:
     cb = ChunkBuilder(OBJECT_FACES)
-    out = [struct.pack("<H", len(faces))]
-    flags = face_flags if face_flags and len(face_flags) == len(faces) else [0]*len(faces)
-    for (a,b,c), fl in zip(faces, flags):
-        out.append(struct.pack("<HHHH", a, b, c, fl))
-    body = b"".join(out)
+    nf = len(faces) // 3
+    # (a, b, c, flags) records: scatter the index triples and flags into one
+    # zeroed u16 array, then emit it with a single tobytes()
+    tris = array("H", faces)
+    recs = array("H", bytes(8*nf))
+    recs[0::4] = tris[0::3]
+    recs[1::4] = tris[1::3]
+    recs[2::4] = tris[2::3]
+    if face_flags and len(face_flags) == nf:
+        recs[3::4] = array("H", face_flags)
+    cb.add(U16.pack(nf))
+    cb.add(le_bytes(recs))
 
     # smoothing masks as subchunk if present
-    if smooth_masks and len(smooth_masks) == len(faces):
+    if smooth_masks and len(smooth_masks) == nf:
         scb = ChunkBuilder(OBJECT_SMOOTH)
-        scb.add(struct.pack("<" + "I"*len(faces), *smooth_masks))
-        body += scb.finalize()
+        scb.add(le_bytes(array("I", smooth_masks)))
+        cb.add_pieces(scb.finalize())
 
     # material assignment subchunks
     for mname, idxs in (mat_faces or {}).items():
@@ -375,81 +461,80 @@ def emit_object_faces(faces: List[Tuple[int,int,int]], face_flags: Optional[List
             continue
         mcb = ChunkBuilder(OBJECT_MATERIAL)
         mcb.add(emit_cstr(mname))
-        mcb.add(struct.pack("<H", len(idxs)))
-        mcb.add(struct.pack("<" + "H"*len(idxs), *idxs))
-        body += mcb.finalize()
+        mcb.add(U16.pack(len(idxs)))
+        mcb.add(le_bytes(idxs))
+        cb.add_pieces(mcb.finalize())
 
-    cb.add(body)
     return cb.finalize()
 
-def emit_object_uv(uvs: List[Tuple[float,float]], expected_count: int, flip_v: bool=False) -> bytes:
-    # ensure 1:1 with verts
-    if len(uvs) != expected_count:
-        if len(uvs) < expected_count:
-            uvs = list(uvs) + [(0.0,0.0)]*(expected_count - len(uvs))
-        else:
-            uvs = list(uvs[:expected_count])
-    out = [struct.pack("<H", len(uvs))]
-    for u,v in uvs:
-        if flip_v:
-            v = 1.0 - float(v)
-        out.append(struct.pack("<ff", float(u), float(v)))
-    return b"".join(out)
-
-def emit_object(mesh: 'Mesh', prefer_channel: int = 1, bake_xform: bool = False, flip_v_4140: bool = False) -> bytes:
+def emit_object_uv(uvs: array, expected_count: int, flip_v: bool=False) -> bytes:
+    # ensure 1:1 with verts (pad with (0, 0) or truncate); an already
+    # matching list is written as-is unless the flip needs a private copy
+    flat = uvs if len(uvs) == 2*expected_count and not flip_v else uvs[:2*expected_count]
+    if len(flat) < 2*expected_count:
+        flat.frombytes(bytes(4*(2*expected_count - len(flat))))
+    if flip_v:
+        flat[1::2] = array("f", [1.0 - v for v in flat[1::2]])
+    return U16.pack(expected_count) + le_bytes(flat)
+
+def emit_object(mesh: 'Mesh', prefer_channel: int = 1, bake_xform: bool = False, flip_v_4140: bool = False) -> List[bytes]:
     name = mesh.name or "Object"
     cb = ChunkBuilder(OBJECT)
     cb.add(emit_cstr(name))
 
-    # Resolve verts/faces/uvs with FMC split
-    verts = mesh.vertices
-    faces = mesh.faces
-    if mesh.fmc_channels.get(prefer_channel):
-        verts, uvs, faces = rebuild_with_fmc(mesh, prefer_channel)
+    # Resolve verts/faces/uvs with FMC split; the split also bakes the
+    # transform and flips V while gathering, otherwise do both here
+    matrix = mesh.trans_matrix if bake_xform else None
+    flip_v = flip_v_4140
+    split = rebuild_with_fmc(mesh, prefer_channel, matrix, flip_v)
+    if split:
+        verts, uvs, faces = split
+        matrix, flip_v = None, False
     else:
-        uvs = mesh.uv_primary or []
+        verts, uvs, faces = mesh.vertices, mesh.uv_primary, mesh.faces
 
     # Bake transform if requested
-    if bake_xform and mesh.trans_matrix:
-        verts = apply_matrix_to_vertices(verts, mesh.trans_matrix)
+    if matrix:
+        verts = apply_matrix_to_vertices(verts, matrix)
 
     # Emit mesh block
     mb = ChunkBuilder(OBJECT_MESH)
     mb.add_chunk(POINT_ARRAY, emit_point_array(verts))
     if uvs:
-        mb.add_chunk(OBJECT_UV, emit_object_uv(uvs, expected_count=len(verts), flip_v=flip_v_4140))
-    mb.add(emit_object_faces(faces, mesh.face_flags, mesh.smooth_masks, mesh.mat_faces))
+        mb.add_chunk(OBJECT_UV, emit_object_uv(uvs, expected_count=len(verts) // 3, flip_v=flip_v))
+    mb.add_pieces(emit_object_faces(faces, mesh.face_flags, mesh.smooth_masks, mesh.mat_faces))
     if (not bake_xform) and mesh.trans_matrix:
         mb.add_chunk(OBJECT_TRANS_MATRIX, mesh.trans_matrix)
 
-    cb.add(mb.finalize())
+    cb.add_pieces(mb.finalize())
 
     return cb.finalize()
 
-def compose_3ds(doc: 'Doc', prefer_channel: int = 1, bake_xform: bool = False, flip_v_4140: bool = False) -> bytes:
+def compose_3ds(doc: 'Doc', prefer_channel: int = 1, bake_xform: bool = False, flip_v_4140: bool = False) -> List[bytes]:
+    """Build the whole 3DS file as a list of byte pieces (write with writelines)."""
     root = ChunkBuilder(PRIMARY)
     # Version 3 (matches H&D I3D examples)
-    root.add_chunk(M3D_VERSION, struct.pack("<I", 3))
+    root.add_chunk(M3D_VERSION, U32.pack(3))
 
     # OBJECTINFO container
     edit = ChunkBuilder(OBJECTINFO)
 
     # Materials
     for mname, meta in doc.materials.items():
-        edit.add(emit_material(mname, meta))
+        edit.add_pieces(emit_material(mname, meta))
 
     # Ensure materials referenced by meshes exist (create empty if missing)
     for mesh in doc.meshes:
         for mname in mesh.mat_faces.keys():
             if mname and mname not in doc.materials:
                 doc.materials[mname] = {"filepath": None}
-                edit.add(emit_material(mname, {"filepath": None}))
+                edit.add_pieces(emit_material(mname, {"filepath": None}))
 
     # Objects
     for mesh in doc.meshes:
-        edit.add(emit_object(mesh, prefer_channel=prefer_channel, bake_xform=bake_xform, flip_v_4140=flip_v_4140))
+        edit.add_pieces(emit_object(mesh, prefer_channel=prefer_channel, bake_xform=bake_xform, flip_v_4140=flip_v_4140))
 
-    root.add(edit.finalize())
+    root.add_pieces(edit.finalize())
 
     # Append raw KFDATA blocks if any
     for blob in doc.kfdata_blobs:
@@ -458,33 +543,117 @@ def compose_3ds(doc: 'Doc', prefer_channel: int = 1, bake_xform: bool = False, f
     return root.finalize()
 
 # ---------- CLI ----------
+def expand_inputs(specs: List[str], suffix: str) -> List[Path]:
+    """Directories expand to their *suffix files, unmatched paths with wildcards to glob hits."""
+    paths: List[Path] = []
+    for spec in specs:
+        p = Path(spec)
+        if p.is_dir():
+            paths.extend(sorted(q for q in p.iterdir() if q.is_file() and q.suffix.lower() == suffix))
+        elif not p.exists() and glob.has_magic(spec):
+            paths.extend(Path(q) for q in sorted(glob.glob(spec, recursive=True)))
+        else:
+            paths.append(p)
+    # a file named twice (overlapping globs, a directory and a glob) is converted once
+    seen = set()
+    unique: List[Path] = []
+    for p in paths:
+        key = p.resolve()
+        if key not in seen:
+            seen.add(key)
+            unique.append(p)
+    return unique
+
+def find_output_clash(jobs) -> Optional[str]:
+    """Batch jobs are (input, output, ...) tuples; name the first two inputs sharing an output."""
+    owner = {}
+    for src, dst, *_ in jobs:
+        prev = owner.setdefault(dst.resolve(), src)
+        if prev is not src:
+            return f"{prev} and {src} would both be written to {dst}"
+    return None
+
+def convert_one(in_path: Path, out_path: Path, channel: int = 1, bake_xform: bool = False, flip_v_4140: bool = False):
+    print(f"[I3D] Loading: {in_path}")
+    doc = parse_i3d(in_path)
+    print(f"[I3D] Meshes: {len(doc.meshes)} | Materials: {len(doc.materials)} | KFDATA blobs: {len(doc.kfdata_blobs)}")
+
+    pieces = compose_3ds(doc, prefer_channel=channel, bake_xform=bake_xform, flip_v_4140=flip_v_4140)
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("wb", buffering=1 << 20) as f:
+        f.writelines(pieces)
+    print(f"[OK ] Wrote: {out_path.resolve()} ({sum(map(len, pieces))} bytes)")
+
+def _convert_job(job) -> Optional[str]:
+    # Batch worker: report failures instead of tearing down the whole pool.
+    in_path, out_path, channel, bake_xform, flip_v_4140 = job
+    try:
+        convert_one(in_path, out_path, channel, bake_xform, flip_v_4140)
+    except Exception as e:
+        return f"{in_path}: {type(e).__name__}: {e}"
+    return None
+
 def main():
     ap = argparse.ArgumentParser(description="I3D → 3DS converter with FMC UV splitting and 3ds Max-friendly materials.")
-    ap.add_argument("i3d_file", help="Path to input .i3d")
-    ap.add_argument("-o", "--output", help="Path to output .3ds (default: alongside input)")
+    ap.add_argument("i3d_file", nargs="+", help="Path to input .i3d (several files, a directory or a glob convert in batch)")
+    ap.add_argument("-o", "--output", help="Path to output .3ds, or output directory in batch mode (default: alongside input)")
     ap.add_argument("--channel", type=int, default=1, help="FACE_MAP_CHANNEL index to use (default: 1)")
     ap.add_argument("--bake-xform", action="store_true", help="Bake OBJECT_TRANS_MATRIX (0x4160) into vertices")
     ap.add_argument("--flip-v-4140", action="store_true", help="Flip V in emitted 0x4140 (v = 1 - v). Default OFF.")
+    ap.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes in batch mode (default: CPU count)")
     args = ap.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        ap.error("-j/--jobs must be at least 1")
 
-    in_path = Path(args.i3d_file)
-    if not in_path.exists() or in_path.suffix.lower() != ".i3d":
-        print(f"[ERR] Not a valid .i3d: {in_path}")
+    inputs = expand_inputs(args.i3d_file, ".i3d")
+    if not inputs:
+        print(f"[ERR] No .i3d files matched: {' '.join(args.i3d_file)}")
         sys.exit(2)
-
-    out_path = Path(args.output) if args.output else in_path.with_suffix(".3ds")
-
-    print(f"[I3D] Loading: {in_path}")
-    doc = parse_i3d(in_path)
-    print(f"[I3D] Meshes: {len(doc.meshes)} | Materials: {len(doc.materials)} | KFDATA blobs: {len(doc.kfdata_blobs)}")
-
-    blob = compose_3ds(doc, prefer_channel=args.channel, bake_xform=args.bake_xform, flip_v_4140=args.flip_v_4140)
-
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_bytes(blob)
-    print(f"[OK ] Wrote: {out_path.resolve()} ({len(blob)} bytes)")
+    for in_path in inputs:
+        if not in_path.exists() or in_path.suffix.lower() != ".i3d":
+            print(f"[ERR] Not a valid .i3d: {in_path}")
+            sys.exit(2)
+
+    if inputs == [Path(args.i3d_file[0])] and len(args.i3d_file) == 1:
+        in_path = inputs[0]
+        out_path = Path(args.output) if args.output else in_path.with_suffix(".3ds")
+        convert_one(in_path, out_path, args.channel, args.bake_xform, args.flip_v_4140)
+        if args.bake_xform:
+            print("[INFO] Transforms baked; 0x4160 omitted on meshes that had it.")
+        return
+
+    # Batch: every file is parsed and written independently, one per worker.
+    out_dir = Path(args.output) if args.output else None
+    if out_dir and (out_dir.suffix.lower() == ".3ds" or out_dir.is_file()):
+        print(f"[ERR] -o must be a directory when several inputs are given: {out_dir}")
+        sys.exit(2)
+    jobs = [(p, (out_dir / p.name if out_dir else p).with_suffix(".3ds"),
+             args.channel, args.bake_xform, args.flip_v_4140) for p in inputs]
+    clash = find_output_clash(jobs)
+    if clash:
+        print(f"[ERR] {clash}")
+        sys.exit(2)
+    if out_dir:
+        try:
+            out_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            print(f"[ERR] Cannot create output directory {out_dir}: {e}")
+            sys.exit(2)
+    # imported here: the pool machinery costs ~25 ms of start-up that a
+    # single-file run should not pay
+    from concurrent.futures import ProcessPoolExecutor
+    workers = args.jobs or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        errors = [err for err in ex.map(_convert_job, jobs, chunksize=chunksize) if err]
+    for err in errors:
+        print(f"[ERR] {err}")
+    print(f"[OK ] Converted {len(jobs) - len(errors)}/{len(jobs)} file(s)")
     if args.bake_xform:
         print("[INFO] Transforms baked; 0x4160 omitted on meshes that had it.")
+    if errors:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
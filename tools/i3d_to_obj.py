@@ -18,36 +18,49 @@ import sys
 import struct
 import argparse
 import re
-from collections import defaultdict
+from array import array
 from typing import Callable, Tuple, Optional
 
 # ---------- Small helpers ----------------------------------------------------
 
+# Precompiled binary layouts (little-endian)
+CHUNK_HDR = struct.Struct("<HI")
+U16       = struct.Struct("<H")
+U32       = struct.Struct("<I")
+F32       = struct.Struct("<f")
+XFORM_12F = struct.Struct("<12f")  # 0x4160 placement matrix
+
 def log(msg: str) -> None:
     print(msg)
 
-def read_chunk(f):
-    """Return (cid, length, endpos) or None if EOF."""
-    hdr = f.read(6)
-    if len(hdr) < 6:
+def read_chunk(buf, pos):
+    """Return (cid, length, endpos) for the header at buf[pos], or None if EOF."""
+    if pos + 6 > len(buf):
         return None
-    cid, length = struct.unpack("<HI", hdr)
-    endpos = f.tell() + (length - 6)
-    return cid, length, endpos
-
-def read_cstr(f):
-    """Read a 0-terminated ASCII string."""
-    out = bytearray()
-    while True:
-        b = f.read(1)
-        if not b or b == b"\x00":
-            break
-        out.extend(b)
-    return out.decode("ascii", errors="replace")
-
-def read_u16(f):  return struct.unpack("<H", f.read(2))[0]
-def read_u32(f):  return struct.unpack("<I", f.read(4))[0]
-def read_f32(f):  return struct.unpack("<f", f.read(4))[0]
+    cid, length = CHUNK_HDR.unpack_from(buf, pos)
+    return cid, length, pos + length
+
+def read_cstr(buf, pos):
+    """Read a 0-terminated ASCII string; returns (text, position after the NUL)."""
+    end = buf.find(b"\x00", pos)
+    if end < 0:
+        return buf[pos:].decode("ascii", errors="replace"), max(pos, len(buf))
+    return buf[pos:end].decode("ascii", errors="replace"), end + 1
+
+def read_array(buf, pos, typecode, count):
+    """`count` little-endian items of `typecode` at buf[pos:] (struct.error if truncated)."""
+    arr = array(typecode)
+    end = pos + arr.itemsize * count
+    if end > len(buf):
+        raise struct.error(f"unpack requires a buffer of {end - pos} bytes")
+    arr.frombytes(memoryview(buf)[pos:end])
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+def read_u16(buf, pos):  return U16.unpack_from(buf, pos)[0]
+def read_u32(buf, pos):  return U32.unpack_from(buf, pos)[0]
+def read_f32(buf, pos):  return F32.unpack_from(buf, pos)[0]
 
 def clamp(v, lo, hi):
     return max(lo, min(hi, v))
@@ -112,7 +125,7 @@ class I3DMesh:
         self.faces         = []      # [(vi, vj, vk), ...] (u16 indices)
         self.face_flags    = []      # [u16] (not used by OBJ)
         self.smooth_masks  = []      # [u32]
-        self.mat_faces     = defaultdict(list)  # mtl_name -> [face_index, ...]
+        self.mat_faces     = {}      # mtl_name -> array('H') of face indices
         self.uv_channels   = {}      # ch -> {"uv": [(u,v),...], "tris": [(ta,tb,tc), ...]}
         self.matrix_3x4    = None    # 3x4 row-major transform
 
@@ -135,132 +148,141 @@ def parse_i3d(path: str) -> I3DDoc:
     doc = I3DDoc()
     log(f"[I3D] Loading: {path}")
     with open(path, "rb") as f:
-        while True:
-            ch = read_chunk(f)
-            if not ch:
-                break
-            cid, _length, endpos = ch
-            if cid == PRIMARY:
-                _parse_primary(f, endpos, doc)
-            f.seek(endpos)
+        buf = f.read()
+    _walk_chunks(buf, doc)
     _post_parse_log(doc)
     return doc
 
-def _parse_primary(f, endpos, doc: I3DDoc):
-    while f.tell() < endpos:
-        ch = read_chunk(f)
-        if not ch: break
+def _walk_chunks(buf, doc: I3DDoc):
+    """
+    Walk the chunk tree iteratively over the in-memory file.
+    Each open container is a stack frame (end, cid, ctx, resume); a child is
+    dispatched on (parent cid, child cid) via _HANDLERS. A handler either
+    consumes a leaf (the walker then jumps to the chunk end) or returns
+    (pos, ctx) to open it as a container. When a container runs out of
+    children the walker resumes at its end, except for the (parent, child)
+    pairs in _NO_SEEK which continue from wherever their children stopped.
+    """
+    stack = [(len(buf), None, None, None)]
+    pos = 0
+    while stack:
+        end, parent, ctx, resume = stack[-1]
+        ch = read_chunk(buf, pos) if pos < end else None
+        if not ch:
+            stack.pop()
+            if parent == MATERIAL:
+                _close_material(ctx, doc)
+            if resume is not None:
+                pos = resume
+            continue
         cid, _length, e2 = ch
-        if cid == OBJECTINFO:
-            _parse_objectinfo(f, e2, doc)
+        handler = _HANDLERS.get(parent, {}).get(cid)
+        opened = handler(buf, pos + 6, e2, doc, ctx) if handler else None
+        if opened is None:
+            pos = e2
         else:
-            f.seek(e2)
+            pos, child_ctx = opened
+            stack.append((e2, cid, child_ctx, None if (parent, cid) in _NO_SEEK else e2))
 
-def _parse_objectinfo(f, endpos, doc: I3DDoc):
-    while f.tell() < endpos:
-        ch = read_chunk(f)
-        if not ch: break
-        cid, _length, e2 = ch
-        if cid == EDIT_CONFIG:
-            if e2 - f.tell() >= 4:
-                doc.mesh_version = read_u32(f)
-        elif cid == MATERIAL:
-            _parse_material(f, e2, doc)
-        elif cid == OBJECT:
-            _parse_object(f, e2, doc.mesh)
-        f.seek(e2)
-
-def _parse_material(f, endpos, doc: I3DDoc):
-    name = None
-    tex  = None
-    while f.tell() < endpos:
-        ch = read_chunk(f)
-        if not ch: break
-        cid, _length, e2 = ch
-        if cid == MAT_NAME:
-            name = read_cstr(f)
-        elif cid == MAT_TEXMAP:
-            while f.tell() < e2:
-                ch2 = read_chunk(f)
-                if not ch2: break
-                cid2, _len2, e3 = ch2
-                if cid2 == MAT_TEX_NAME:
-                    tex = read_cstr(f)
-                f.seek(e3)
-        f.seek(e2)
+def _open_container(buf, pos, endpos, doc: I3DDoc, ctx):
+    return pos, ctx
+
+def _open_objectinfo(buf, pos, endpos, doc: I3DDoc, ctx):
+    return pos, doc
+
+def _parse_edit_config(buf, pos, endpos, doc: I3DDoc, ctx):
+    if endpos - pos >= 4:
+        doc.mesh_version = read_u32(buf, pos)
+
+def _open_material(buf, pos, endpos, doc: I3DDoc, ctx):
+    return pos, {"name": None, "tex": None}
+
+def _parse_mat_name(buf, pos, endpos, doc: I3DDoc, mat):
+    mat["name"], _ = read_cstr(buf, pos)
+
+def _parse_mat_tex_name(buf, pos, endpos, doc: I3DDoc, mat):
+    mat["tex"], _ = read_cstr(buf, pos)
+
+def _close_material(mat, doc: I3DDoc):
+    name, tex = mat["name"], mat["tex"]
     if name:
         doc.materials[name] = {"map_Kd": os.path.basename(tex) if tex else None}
         log(f"[MAT] {name} -> {doc.materials[name]['map_Kd'] or '(no texture)'}")
 
-def _parse_object(f, endpos, mesh: I3DMesh):
-    mesh.name = read_cstr(f)
+def _parse_object(buf, pos, endpos, doc: I3DDoc, ctx):
+    mesh = doc.mesh
+    mesh.name, pos = read_cstr(buf, pos)
     log(f"[OBJ] Object: {mesh.name}")
-    while f.tell() < endpos:
-        ch = read_chunk(f)
-        if not ch: break
-        cid, _length, e2 = ch
-        if cid == OBJECT_MESH:
-            _parse_object_mesh(f, e2, mesh)
-        else:
-            f.seek(e2)
-
-def _parse_object_mesh(f, endpos, mesh: I3DMesh):
-    while f.tell() < endpos:
-        ch = read_chunk(f)
-        if not ch: break
-        cid, _length, e2 = ch
-        if cid == POINT_ARRAY:
-            count = read_u16(f)
-            mesh.vertices = [struct.unpack("<3f", f.read(12)) for _ in range(count)]
-            log(f"[OBJ]   Vertices: {len(mesh.vertices)}")
-        elif cid == OBJECT_FACES:
-            _parse_faces_block(f, e2, mesh)
-        elif cid == OBJECT_SMOOTH:
-            face_count = len(mesh.faces)
-            mesh.smooth_masks = [struct.unpack("<I", f.read(4))[0] for _ in range(face_count)]
-            log(f"[OBJ]   Smoothing masks: {len(mesh.smooth_masks)}")
-        elif cid == OBJECT_TRANS_MATRIX:
-            data = struct.unpack("<12f", f.read(48))
-            mesh.matrix_3x4 = [list(data[0:4]), list(data[4:8]), list(data[8:12])]
-            log(f"[OBJ]   Transform matrix found")
-        elif cid == FACE_MAP_CHANNEL:
-            _parse_face_map_channel(f, mesh)
-        else:
-            pass
-        f.seek(e2)
-
-def _parse_faces_block(f, endpos, mesh: I3DMesh):
-    face_count = read_u16(f)
-    faces = []
-    flags = []
-    for _ in range(face_count):
-        a, b, c = struct.unpack("<3H", f.read(6))
-        faces.append((a, b, c))
-        flags.append(read_u16(f))
-    mesh.faces = faces
-    mesh.face_flags = flags
-    log(f"[OBJ]   Faces: {len(faces)}")
-    while f.tell() < endpos:
-        ch = read_chunk(f)
-        if not ch: break
-        cid, _length, e2 = ch
-        if cid == OBJECT_MATERIAL:
-            mname = read_cstr(f)
-            n = read_u16(f)
-            idxs = [read_u16(f) for _ in range(n)]
-            mesh.mat_faces[mname].extend(idxs)
-            log(f"[OBJ]   Mat group: {mname} -> {len(idxs)} face(s)")
-        f.seek(e2)
-
-def _parse_face_map_channel(f, mesh: I3DMesh):
-    ch_index = read_u32(f)
-    uv_count = read_u16(f)
-    uvs = [struct.unpack("<2f", f.read(8)) for _ in range(uv_count)]
-    face_count = read_u16(f)
-    uv_tris = [struct.unpack("<3H", f.read(6)) for _ in range(face_count)]
+    return pos, mesh
+
+def _parse_point_array(buf, pos, endpos, doc: I3DDoc, mesh: I3DMesh):
+    count = read_u16(buf, pos)
+    flat = read_array(buf, pos + 2, "f", 3*count)
+    mesh.vertices = list(zip(flat[0::3], flat[1::3], flat[2::3]))
+    log(f"[OBJ]   Vertices: {len(mesh.vertices)}")
+
+def _parse_smooth(buf, pos, endpos, doc: I3DDoc, mesh: I3DMesh):
+    mesh.smooth_masks = read_array(buf, pos, "I", len(mesh.faces)).tolist()
+    log(f"[OBJ]   Smoothing masks: {len(mesh.smooth_masks)}")
+
+def _parse_trans_matrix(buf, pos, endpos, doc: I3DDoc, mesh: I3DMesh):
+    data = XFORM_12F.unpack_from(buf, pos)
+    mesh.matrix_3x4 = [list(data[0:4]), list(data[4:8]), list(data[8:12])]
+    log(f"[OBJ]   Transform matrix found")
+
+def _parse_faces_block(buf, pos, endpos, doc: I3DDoc, mesh: I3DMesh):
+    face_count = read_u16(buf, pos)
+    # (a, b, c, flags) records
+    flat = read_array(buf, pos + 2, "H", 4*face_count)
+    mesh.faces = list(zip(flat[0::4], flat[1::4], flat[2::4]))
+    mesh.face_flags = flat[3::4].tolist()
+    log(f"[OBJ]   Faces: {len(mesh.faces)}")
+    return pos + 2 + 8*face_count, mesh
+
+def _parse_object_material(buf, pos, endpos, doc: I3DDoc, mesh: I3DMesh):
+    mname, pos = read_cstr(buf, pos)
+    n = read_u16(buf, pos)
+    idxs = read_array(buf, pos + 2, "H", n)
+    # Usually one complete group per material; only a repeated name concatenates.
+    cur = mesh.mat_faces.get(mname)
+    mesh.mat_faces[mname] = idxs if cur is None else cur + idxs
+    log(f"[OBJ]   Mat group: {mname} -> {len(idxs)} face(s)")
+
+def _parse_face_map_channel(buf, pos, endpos, doc: I3DDoc, mesh: I3DMesh):
+    ch_index = read_u32(buf, pos)
+    uv_count = read_u16(buf, pos + 4)
+    pos += 6
+    flat = read_array(buf, pos, "f", 2*uv_count)
+    uvs = list(zip(flat[0::2], flat[1::2]))
+    pos += 8*uv_count
+    face_count = read_u16(buf, pos)
+    tris = read_array(buf, pos + 2, "H", 3*face_count)
+    uv_tris = list(zip(tris[0::3], tris[1::3], tris[2::3]))
     mesh.uv_channels[ch_index] = {"uv": uvs, "tris": uv_tris}
     log(f"[OBJ]   UVs: channel={ch_index} verts={len(uvs)} faces={len(uv_tris)}")
 
+# parent cid -> {child cid: handler}; None is the file level
+_HANDLERS = {
+    None:            {PRIMARY: _open_container},
+    PRIMARY:         {OBJECTINFO: _open_objectinfo},
+    OBJECTINFO:      {EDIT_CONFIG: _parse_edit_config,
+                      MATERIAL: _open_material,
+                      OBJECT: _parse_object},
+    MATERIAL:        {MAT_NAME: _parse_mat_name,
+                      MAT_TEXMAP: _open_container},
+    MAT_TEXMAP:      {MAT_TEX_NAME: _parse_mat_tex_name},
+    OBJECT:          {OBJECT_MESH: _open_container},
+    OBJECT_MESH:     {POINT_ARRAY: _parse_point_array,
+                      OBJECT_FACES: _parse_faces_block,
+                      OBJECT_SMOOTH: _parse_smooth,
+                      OBJECT_TRANS_MATRIX: _parse_trans_matrix,
+                      FACE_MAP_CHANNEL: _parse_face_map_channel},
+    OBJECT_FACES:    {OBJECT_MATERIAL: _parse_object_material},
+}
+# Containers after which the parent continues where the children stopped
+# instead of jumping to the container's recorded end
+_NO_SEEK = {(PRIMARY, OBJECTINFO), (OBJECT, OBJECT_MESH)}
+
 def _post_parse_log(doc: I3DDoc):
     m = doc.mesh
     log(f"[I3D] Loaded mesh='{m.name}' "
@@ -314,13 +336,15 @@ def save_obj_mtl(base_out_path: str, doc: I3DDoc, uv_channel: int, bake: bool,
 
     # Ensure at least one material group
     if not mesh.mat_faces:
-        mesh.mat_faces["default"] = list(range(len(mesh.faces)))
+        mesh.mat_faces["default"] = array("H", range(len(mesh.faces)))
 
     # Sanitize material names (spaces→underscores) consistently
     if any(k != _safe_newmtl_name(k) for k in mesh.mat_faces.keys()):
-        remapped = defaultdict(list)
+        remapped = {}
         for k, v in mesh.mat_faces.items():
-            remapped[_safe_newmtl_name(k)].extend(v)
+            sk = _safe_newmtl_name(k)
+            cur = remapped.get(sk)
+            remapped[sk] = v if cur is None else cur + v
         mesh.mat_faces = remapped
 
     sanitized_materials = {}
@@ -2,10 +2,13 @@
 # -*- coding: utf-8 -*-
 
 import os
+import re
 import sys
+import mmap
 import struct
 import argparse
-from collections import defaultdict, OrderedDict
+from array import array
+from operator import neg
 
 # ---------------- 3DS / I3D Chunk IDs ----------------
 PRIMARY                 = 0x4D4D
@@ -42,6 +45,11 @@ KFDATA_OBJECT_NODE_TAG  = 0xB002
 KFDATA_NODE_HDR         = 0xB010
 KFDATA_PIVOT            = 0xB013
 
+# Precompiled binary layouts (little-endian)
+CHUNK_HDR               = struct.Struct("<HI")   # chunk id, total size incl. header
+U16                     = struct.Struct("<H")    # element counts
+FMC_HDR                 = struct.Struct("<iH")   # 0x4200 channel index, UV count
+
 # ---------------- Helpers ----------------
 
 def log(msg):
@@ -50,34 +58,119 @@ def log(msg):
 def pack_c_string(s: str) -> bytes:
     return s.encode('ascii', errors='replace') + b'\x00'
 
-def build_chunk(chunk_id, payload=b"", children=None):
-    if children is None:
-        children = []
-    size = 6 + len(payload) + sum(len(c) for c in children)
-    return struct.pack("<HI", chunk_id, size) + payload + b"".join(children)
+def le_bytes(arr: array) -> bytes:
+    """Raw little-endian bytes of a typed array (3DS/I3D is little-endian)."""
+    if sys.byteorder != "little":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+_INF = float("inf")
+
+def f32_array(values) -> array:
+    """float32 array of values; like struct.pack("<f"), a finite value too large
+    for float32 raises OverflowError instead of being stored as inf."""
+    arr = array("f", values)
+    if arr.count(_INF) + arr.count(-_INF) != values.count(_INF) + values.count(-_INF):
+        raise OverflowError("float too large to pack with f format")
+    return arr
+
+class Chunk:
+    """Chunk node: the size is resolved on construction; the tree is streamed by
+    write_chunk(), or flattened by serialize() for build_i3d_file() callers."""
+    __slots__ = ("id", "payload", "children", "size")
+
+    def __init__(self, chunk_id, payload=b"", children=()):
+        self.id = chunk_id
+        self.payload = payload
+        self.children = children
+        if children:
+            self.size = 6 + len(payload) + sum(c.size for c in children)
+        else:   # leaf chunk (most material/mesh subchunks)
+            self.size = 6 + len(payload)
+
+def build_chunk(chunk_id, payload=b"", children=()):
+    return Chunk(chunk_id, payload, children)
+
+def _pack_chunk(node, buf, off):
+    CHUNK_HDR.pack_into(buf, off, node.id, node.size)
+    off += 6
+    end = off + len(node.payload)
+    buf[off:end] = node.payload
+    for child in node.children:
+        end = _pack_chunk(child, buf, end)
+    return end
+
+def write_chunk(f, node):
+    """Stream a chunk tree to a binary file depth-first, without a full-file buffer."""
+    f.write(CHUNK_HDR.pack(node.id, node.size))
+    if node.payload:
+        f.write(node.payload)
+    for child in node.children:
+        write_chunk(f, child)
+
+def serialize(root):
+    """Write a chunk tree into one preallocated buffer (each byte copied once).
+
+    Kept for importers of build_i3d_file(); main() streams with write_chunk()."""
+    buf = bytearray(root.size)
+    _pack_chunk(root, memoryview(buf), 0)
+    return buf
+
+def quantize_rgb(rgb) -> bytes:
+    """Float RGB (0..1) -> three clamped 0..255 bytes (COLOR_24 payload)."""
+    return bytes(max(0, min(255, round(c * 255))) for c in rgb[:3])
 
 def write_color_subchunk(container_chunk_id, rgb):
-    r = max(0, min(255, int(round(rgb[0] * 255))))
-    g = max(0, min(255, int(round(rgb[1] * 255))))
-    b = max(0, min(255, int(round(rgb[2] * 255))))
-    color_payload = struct.pack("<BBB", r, g, b)
-    color_child = build_chunk(COLOR_24, color_payload)
+    color_child = build_chunk(COLOR_24, quantize_rgb(rgb))
     return build_chunk(container_chunk_id, b"", [color_child])
 
+# Constant chunks, built once and shared (Chunk nodes are never mutated)
+VERSION_CHUNK   = build_chunk(M3D_VERSION, struct.pack("<I", 200))
+TWO_SIDE_CHUNK  = build_chunk(MAT_TWO_SIDE)
+
 # ---------------- OBJ/MTL Parsing ----------------
 
+_LINE_RE = re.compile(rb"[^\r\n]+")
+
+def iter_text_lines(path):
+    """Yield stripped, non-empty, non-comment lines of a text file as bytes (memory-mapped)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for m in _LINE_RE.finditer(mm):
+                s = m.group().strip()
+                if s and not s.startswith(b"#"):
+                    yield s
+
+def decode_name(b: bytes) -> str:
+    return b.decode("utf-8", errors="replace")
+
 class OBJData:
     def __init__(self):
-        self.v = []         # [(x,y,z)]
-        self.vt = []        # [(u,v)]
-        self.vn = []        # [(nx,ny,nz)]
-        self.faces_by_mat = OrderedDict()
+        self.v = array("d")     # flat [x0,y0,z0, x1,y1,z1, ...]
+        self.vt = array("d")    # flat [u0,v0, u1,v1, ...]
+        self.vn = array("d")    # flat [nx0,ny0,nz0, ...]
+        self.faces_by_mat = {}
         self.mtl_file = None
         self.object_name = None
 
+    @property
+    def v_count(self):
+        return len(self.v) // 3
+
+    @property
+    def vt_count(self):
+        return len(self.vt) // 2
+
+    @property
+    def vn_count(self):
+        return len(self.vn) // 3
+
 class MTLData:
     def __init__(self):
-        self.materials = OrderedDict()
+        self.materials = {}
 
 def parse_mtl(path):
     mtl = MTLData()
@@ -86,30 +179,45 @@ def parse_mtl(path):
         return mtl
     log(f"[MTL] Loading: {path}")
     current = None
-    with open(path, "r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            s = line.strip()
-            if not s or s.startswith('#'):
-                continue
-            parts = s.split(None, 1)
-            key = parts[0]
-            val = parts[1] if len(parts) > 1 else ""
-            if key == "newmtl":
-                current = val.strip()
-                mtl.materials[current] = {}
-            elif key == "Kd" and current:
-                nums = val.split()
-                if len(nums) >= 3:
-                    try:
-                        mtl.materials[current]["Kd"] = (float(nums[0]), float(nums[1]), float(nums[2]))
-                    except:
-                        pass
-            elif key == "map_Kd" and current:
-                tex = val.strip().split()[0]
-                mtl.materials[current]["map_Kd"] = os.path.basename(tex)
+    for s in iter_text_lines(path):
+        parts = s.split(None, 1)
+        key = parts[0]
+        val = parts[1] if len(parts) > 1 else b""
+        if key == b"newmtl":
+            current = decode_name(val.strip())
+            mtl.materials[current] = {}
+        elif key == b"Kd" and current:
+            nums = val.split()
+            if len(nums) >= 3:
+                try:
+                    mtl.materials[current]["Kd"] = (float(nums[0]), float(nums[1]), float(nums[2]))
+                except:
+                    pass
+        elif key == b"map_Kd" and current:
+            tex = decode_name(val.strip().split()[0])
+            mtl.materials[current]["map_Kd"] = os.path.basename(tex)
     log(f"[MTL] Loaded materials: {len(mtl.materials)}")
     return mtl
 
+def fix_index(i, n):
+    """1-based (or negative, relative) OBJ index -> 0-based index; None passes through."""
+    if i is None:
+        return None
+    return i - 1 if i > 0 else n + i
+
+def parse_face_ref(tok, nv, nvt, nvn):
+    """Parse one face corner (b'v', b'v/t', b'v//n', b'v/t/n') into 0-based (vi, ti, ni)."""
+    if b"/" not in tok:
+        return fix_index(int(tok), nv), None, None
+    sp = tok.split(b"/")
+    vi = int(sp[0]) if sp[0] else None
+    ti = ni = None
+    if len(sp) in (2, 3):
+        ti = int(sp[1]) if sp[1] else None
+    if len(sp) == 3:
+        ni = int(sp[2]) if sp[2] else None
+    return fix_index(vi, nv), fix_index(ti, nvt), fix_index(ni, nvn)
+
 def parse_obj(path):
     obj = OBJData()
     if not os.path.isfile(path):
@@ -120,88 +228,66 @@ def parse_obj(path):
     current_mat = None
     current_sgroup = 1
 
-    with open(path, "r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            s = line.strip()
-            if not s or s.startswith('#'):
+    # v/vt/vn tokens are bucketed here and converted in one go after the scan;
+    # the running counts are still needed for relative (negative) face refs.
+    v_tok, vt_tok, vn_tok = [], [], []
+    nv = nvt = nvn = 0
+
+    for s in iter_text_lines(path):
+        parts = s.split()
+        key = parts[0]
+        vals = parts[1:]
+
+        if key == b"o":
+            obj.object_name = decode_name(b" ".join(vals)) if vals else obj.object_name
+        elif key == b"mtllib":
+            candidate = decode_name(b" ".join(vals))
+            obj.mtl_file = candidate if os.path.isabs(candidate) else os.path.join(base_dir, candidate)
+        elif key == b"usemtl":
+            current_mat = decode_name(b" ".join(vals)) if vals else None
+            if current_mat not in obj.faces_by_mat:
+                obj.faces_by_mat[current_mat] = []
+        elif key == b"s":
+            if not vals or vals[0].lower() == b"off":
+                current_sgroup = 0
+            else:
+                try:
+                    current_sgroup = int(vals[0])
+                except:
+                    current_sgroup = 1
+        elif key == b"v":
+            if len(vals) >= 3:
+                v_tok += vals[:3]
+                nv += 1
+        elif key == b"vt":
+            if len(vals) >= 2:
+                vt_tok += vals[:2]
+                nvt += 1
+        elif key == b"vn":
+            if len(vals) >= 3:
+                vn_tok += vals[:3]
+                nvn += 1
+        elif key == b"f":
+            if len(vals) < 3:
                 continue
-            parts = s.split()
-            key = parts[0]
-            vals = parts[1:]
-
-            if key == "o":
-                obj.object_name = " ".join(vals) if vals else obj.object_name
-            elif key == "mtllib":
-                candidate = " ".join(vals)
-                obj.mtl_file = candidate if os.path.isabs(candidate) else os.path.join(base_dir, candidate)
-            elif key == "usemtl":
-                current_mat = " ".join(vals) if vals else None
-                if current_mat not in obj.faces_by_mat:
-                    obj.faces_by_mat[current_mat] = []
-            elif key == "s":
-                if not vals or vals[0].lower() == "off":
-                    current_sgroup = 0
-                else:
-                    try:
-                        current_sgroup = int(vals[0])
-                    except:
-                        current_sgroup = 1
-            elif key == "v":
-                if len(vals) >= 3:
-                    obj.v.append((float(vals[0]), float(vals[1]), float(vals[2])))
-            elif key == "vt":
-                if len(vals) >= 2:
-                    obj.vt.append((float(vals[0]), float(vals[1])))
-            elif key == "vn":
-                if len(vals) >= 3:
-                    obj.vn.append((float(vals[0]), float(vals[1]), float(vals[2])))
-            elif key == "f":
-                if len(vals) < 3:
-                    continue
-
-                def parse_ref(tok):
-                    vi = ti = ni = None
-                    if "/" in tok:
-                        sp = tok.split("/")
-                        if len(sp) == 3:
-                            vi = int(sp[0]) if sp[0] else None
-                            ti = int(sp[1]) if sp[1] else None
-                            ni = int(sp[2]) if sp[2] else None
-                        elif len(sp) == 2:
-                            vi = int(sp[0]) if sp[0] else None
-                            ti = int(sp[1]) if sp[1] else None
-                        else:
-                            vi = int(sp[0]) if sp[0] else None
-                    else:
-                        vi = int(tok)
-                    return vi, ti, ni
-
-                refs = [parse_ref(t) for t in vals]
-
-                def fix_index(i, n):
-                    if i is None:
-                        return None
-                    return i - 1 if i > 0 else n + i
-
-                if current_mat not in obj.faces_by_mat:
-                    obj.faces_by_mat[current_mat] = []
-
-                for j in range(1, len(refs) - 1):
-                    a, b, c = refs[0], refs[j], refs[j + 1]
-                    tri = []
-                    for ref in (a, b, c):
-                        vi, ti, ni = ref
-                        tri.append((
-                            fix_index(vi, len(obj.v)),
-                            fix_index(ti, len(obj.vt)) if ti is not None else None,
-                            fix_index(ni, len(obj.vn)) if ni is not None else None
-                        ))
-                    obj.faces_by_mat[current_mat].append({'tri': tuple(tri), 'sg': current_sgroup})
-
-    v_count = len(obj.v)
-    vt_count = len(obj.vt)
+
+            refs = [parse_face_ref(t, nv, nvt, nvn) for t in vals]
+
+            if current_mat not in obj.faces_by_mat:
+                obj.faces_by_mat[current_mat] = []
+            recs = obj.faces_by_mat[current_mat]
+
+            # Fan triangulation around the first corner
+            first = refs[0]
+            for j in range(1, len(refs) - 1):
+                recs.append({'tri': (first, refs[j], refs[j + 1]), 'sg': current_sgroup})
+
+    obj.v = array("d", map(float, v_tok))
+    obj.vt = array("d", map(float, vt_tok))
+    obj.vn = array("d", map(float, vn_tok))
+
     f_count = sum(len(lst) for lst in obj.faces_by_mat.values())
-    log(f"[OBJ] Loaded: {v_count} verts, {vt_count} uvs, {len(obj.vn)} normals, {f_count} faces, {len(obj.faces_by_mat)} materials")
+    log(f"[OBJ] Loaded: {obj.v_count} verts, {obj.vt_count} uvs, {obj.vn_count} normals, {f_count} faces, {len(obj.faces_by_mat)} materials")
     return obj
 
 # ---------------- Builders ----------------
@@ -210,11 +296,10 @@ def enforce_3ds_limits(verts_len, faces_len):
     if verts_len > 65535 or faces_len > 65535:
         raise ValueError(f"3DS/I3D per-mesh limits exceeded (verts={verts_len}, faces={faces_len}, both must be <= 65535).")
 
+_TWO_SIDED_RE = re.compile(r"2sd|two", re.IGNORECASE)
+
 def is_two_sided_material(name: str) -> bool:
-    if not name:
-        return False
-    s = name.lower()
-    return "2sd" in s or "two" in s
+    return bool(name) and _TWO_SIDED_RE.search(name) is not None
 
 def build_material_chunks(mtl: MTLData, used_mats_in_order):
     chunks = []
@@ -228,7 +313,7 @@ def build_material_chunks(mtl: MTLData, used_mats_in_order):
             kd = props["Kd"]
             sub.append(write_color_subchunk(MAT_DIFFUSE, kd))
         if is_two_sided_material(name):
-            sub.append(build_chunk(MAT_TWO_SIDE, b""))
+            sub.append(TWO_SIDE_CHUNK)
         if "map_Kd" in props:
             tex = props["map_Kd"]
             tsubs = [ build_chunk(MAT_TEXNAME, pack_c_string(os.path.basename(tex))) ]
@@ -237,94 +322,93 @@ def build_material_chunks(mtl: MTLData, used_mats_in_order):
     return chunks
 
 def assemble_faces_uv_corners(obj: OBJData):
+    """
+    Flatten faces_by_mat into per-face lists. Materials are emitted one after
+    another, so every material owns one contiguous run of face indices
+    (returned as mat_ranges: material -> range, in first-use order).
+    """
     faces_geo, faces_uv, sgroups = [], [], []
-    used_mats_in_order = []
-    for key, recs in obj.faces_by_mat.items():
+    mat_ranges = {}
+    for mk, recs in obj.faces_by_mat.items():
         if not recs:
             continue
-        mk = key
-        if mk not in used_mats_in_order:
-            used_mats_in_order.append(mk)
+        start = len(faces_geo)
         for rec in recs:
             (vi0, ti0, _), (vi1, ti1, _), (vi2, ti2, _) = rec['tri']
             faces_geo.append((vi0, vi1, vi2, mk))
             faces_uv.append((ti0, ti1, ti2))
             sg = rec.get('sg', 1)
             sgroups.append(int(sg) if isinstance(sg, int) else 1)
-    return faces_geo, faces_uv, sgroups, used_mats_in_order
+        mat_ranges[mk] = range(start, len(faces_geo))
+    return faces_geo, faces_uv, sgroups, mat_ranges
 
 def smoothing_chunk_from_groups(sgroups):
-    payload = bytearray()
-    for sg in sgroups:
-        if sg <= 0:
-            mask = 0
-        else:
-            bit = min(31, sg - 1)
-            mask = (1 << bit)
-        payload += struct.pack("<I", mask)
-    return build_chunk(OBJECT_SMOOTH, bytes(payload))
+    # group N -> bit N-1 (groups past 32 share bit 31); 'off' -> 0
+    masks = array("I", [0 if sg <= 0 else 1 << min(31, sg - 1) for sg in sgroups])
+    return build_chunk(OBJECT_SMOOTH, le_bytes(masks))
 
 def build_uv_channel_dedup(obj: OBJData, faces_uv, *, flip_v=True, channel_index=1):
-    uv_index_of = {}
-    uv_list = []
-    uv_indices = []
-
-    def get_idx(u, v):
-        key = (u, v)
-        idx = uv_index_of.get(key)
-        if idx is None:
-            idx = len(uv_list)
-            uv_index_of[key] = idx
-            uv_list.append((u, v))
-        return idx
-
-    for (ti0, ti1, ti2) in faces_uv:
-        tri_idx = []
-        for ti in (ti0, ti1, ti2):
-            if ti is not None and 0 <= ti < len(obj.vt):
-                u, v = obj.vt[ti]
-                if flip_v:
-                    v = 1.0 - v
-            else:
-                u, v = 0.0, 0.0
-            tri_idx.append(get_idx(float(u), float(v)))
-        uv_indices.append(tuple(tri_idx))
-
-    payload = struct.pack("<iH", int(channel_index), len(uv_list))
-    for (u, v) in uv_list:
-        payload += struct.pack("<ff", u, v)
-    payload += struct.pack("<H", len(uv_indices))
-    for (a, b, c) in uv_indices:
-        payload += struct.pack("<HHH", a, b, c)
+    vt = obj.vt
+    vt_count = obj.vt_count
+    vs = vt[1::2]
+    if flip_v:
+        vs = array("d", [1.0 - v for v in vs])
+    # One (u, v) key per vt entry, plus a trailing (0, 0) slot for corners
+    # without a valid UV ref; corners then only gather from this table.
+    uv_keys = list(zip(vt[0::2], vs))
+    uv_keys.append((0.0, 0.0))
+    missing = vt_count
+    corner_refs = [ti if ti is not None and 0 <= ti < vt_count else missing
+                   for tri in faces_uv for ti in tri]
+
+    # dict.fromkeys keeps first-occurrence order, so UV indices match the
+    # order in which faces first reference them. Dedup the integer vt refs
+    # first; only the distinct refs go through the (u, v) float-tuple pass
+    # that merges repeated vt lines.
+    refs = list(dict.fromkeys(corner_refs))
+    uv_list = list(dict.fromkeys(map(uv_keys.__getitem__, refs)))
+    uv_index_of = {uv: i for i, uv in enumerate(uv_list)}
+    ref_uv_index = {r: uv_index_of[uv_keys[r]] for r in refs}
+    uv_indices = array("H", map(ref_uv_index.__getitem__, corner_refs))
+
+    uvs = f32_array([c for uv in uv_list for c in uv])
+    payload = b"".join((
+        FMC_HDR.pack(int(channel_index), len(uv_list)),
+        le_bytes(uvs),
+        U16.pack(len(faces_uv)),
+        le_bytes(uv_indices),
+    ))
     return build_chunk(FACE_MAP_CHANNEL, payload)
 
 def build_mesh_chunks(obj: OBJData, object_name: str, *, flip_v=True):
-    faces_geo, faces_uv, sgroups, used_mats_in_order = assemble_faces_uv_corners(obj)
-    vertices = [(x, -y, -z) for (x, y, z) in obj.v]
-    enforce_3ds_limits(len(vertices), len(faces_geo))
-    log(f"[I3D] Geometry: {len(vertices)} verts, {len(faces_geo)} faces; materials referenced: {len([m for m in used_mats_in_order if m])}")
-    v_payload = struct.pack("<H", len(vertices)) + b"".join(struct.pack("<fff", *p) for p in vertices)
+    faces_geo, faces_uv, sgroups, mat_ranges = assemble_faces_uv_corners(obj)
+    used_mats_in_order = list(mat_ranges)
+    v_count = len(obj.v) // 3
+    enforce_3ds_limits(v_count, len(faces_geo))
+    log(f"[I3D] Geometry: {v_count} verts, {len(faces_geo)} faces; materials referenced: {len([m for m in used_mats_in_order if m])}")
+    vertices = f32_array(obj.v)     # (x, y, z) -> (x, -y, -z)
+    vertices[1::3] = array("f", map(neg, vertices[1::3]))
+    vertices[2::3] = array("f", map(neg, vertices[2::3]))
+    v_payload = U16.pack(v_count) + le_bytes(vertices)
     vert_chunk = build_chunk(OBJECT_VERTICES, v_payload)
-    f_payload = struct.pack("<H", len(faces_geo))
+    f_idx = array("H")
     for (a, b, c, _mk) in faces_geo:
         if a is None or b is None or c is None:
             raise ValueError("Face has missing vertex index.")
-        f_payload += struct.pack("<HHHH", a, b, c, 0)
+        f_idx.extend((a, b, c, 0))
+    f_payload = U16.pack(len(faces_geo)) + le_bytes(f_idx)
     face_sub = []
-    mat_to_indices = defaultdict(list)
-    for idx, (_, _, _, mk) in enumerate(faces_geo):
-        if mk:
-            mat_to_indices[mk].append(idx)
-    for mk, idxs in mat_to_indices.items():
-        if not idxs:
+    for mk, idxs in mat_ranges.items():
+        if not mk:
             continue
-        sub = pack_c_string(mk) + struct.pack("<H", len(idxs)) + b"".join(struct.pack("<H", i) for i in idxs)
+        sub = pack_c_string(mk) + U16.pack(len(idxs)) + le_bytes(array("H", idxs))
         face_sub.append(build_chunk(OBJECT_MAT_GROUP, sub))
     smooth_chunk = smoothing_chunk_from_groups(sgroups)
     face_sub.append(smooth_chunk)
     faces_chunk = build_chunk(OBJECT_FACES, f_payload, face_sub)
-    has_uvs = (len(obj.vt) > 0) and any(
-        any((ti is not None) and (0 <= ti < len(obj.vt)) for ti in triplet)
+    vt_count = obj.vt_count
+    has_uvs = (vt_count > 0) and any(
+        any((ti is not None) and (0 <= ti < vt_count) for ti in triplet)
         for triplet in faces_uv
     )
     mesh_children = [vert_chunk, faces_chunk]
@@ -361,27 +445,32 @@ def build_kfdata_root(object_name: str, scene_name=None):
 
 # ---------------- Top-level file build ----------------
 
-def build_i3d_file(obj: OBJData, mtl: MTLData, object_name: str, *, flip_v=True, include_kf=False):
+def build_i3d_tree(obj: OBJData, mtl: MTLData, object_name: str, *, flip_v=True, include_kf=False):
     """
-    Build an I3D-like (3DS-derived) file, minimal variant:
+    Build the chunk tree of an I3D-like (3DS-derived) file, minimal variant:
       - M3D_VERSION (0x0002, value=200) under PRIMARY
       - OBJECTINFO contains MATERIALS (only those present), then OBJECT
       - OBJECT_SMOOTH (0x4150) is inside OBJECT_FACES (0x4120)
       - FACE_MAP_CHANNEL (0x4200) only when faces actually reference UVs
     """
-    version_chunk = build_chunk(M3D_VERSION, struct.pack("<I", 200))
     obj_chunk, used_mats_in_order = build_mesh_chunks(obj, object_name, flip_v=flip_v)
     mat_chunks = build_material_chunks(mtl, used_mats_in_order)
     objectinfo_children = []
     objectinfo_children += mat_chunks
     objectinfo_children.append(obj_chunk)
     objectinfo = build_chunk(OBJECTINFO, b"", objectinfo_children)
-    children = [version_chunk, objectinfo]
+    children = [VERSION_CHUNK, objectinfo]
     if include_kf:
         kf = build_kfdata_root(object_name, scene_name=object_name)
         children.append(kf)
     return build_chunk(PRIMARY, b"", children)
 
+def build_i3d_file(obj: OBJData, mtl: MTLData, object_name: str, *, flip_v=True, include_kf=False):
+    """Same as build_i3d_tree(), serialized to one in-memory buffer.
+
+    Kept only for importers; the CLI streams the tree with write_chunk()."""
+    return serialize(build_i3d_tree(obj, mtl, object_name, flip_v=flip_v, include_kf=include_kf))
+
 # ---------------- CLI ----------------
 
 def main():
@@ -407,17 +496,17 @@ def main():
     log(f"[CFG] Output I3D  : {out_path}")
     log(f"[CFG] UV channel  : 1 (0x4200 when present)")
 
-    if len(obj.vt) == 0:
+    if obj.vt_count == 0:
         log("[INFO] OBJ has no UVs; FACE_MAP_CHANNEL (0x4200) will be omitted if faces don't reference vt.")
 
-    data = build_i3d_file(
+    root = build_i3d_tree(
         obj, mtl, object_name,
         flip_v=(not args.no_flip_v),
         include_kf=args.kf
     )
 
-    with open(out_path, "wb") as f:
-        f.write(data)
+    with open(out_path, "wb", buffering=1 << 20) as f:
+        write_chunk(f, root)
     sz = os.path.getsize(out_path)
     log(f"[OK] Wrote I3D: {out_path} ({sz} bytes)")
 